@@ -0,0 +1,6 @@
+"""Application Caches"""
+
+from .semantic_cache import SemanticCache
+from .context_cache import ContextCache
+
+__all__ = ["SemanticCache", "ContextCache"]
@@ -0,0 +1,77 @@
+"""
+Context Cache - Cache del contexto construido para un mismo conjunto de chunks
+"""
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+from domain.entities.query_result import SimilarChunk
+
+
+class ContextCache:
+    """
+    Cache LRU en memoria del contexto enviado al LLM
+
+    La clave es la secuencia ordenada de identificadores de los chunks
+    recuperados: el contexto numera las fuentes, así que el mismo conjunto
+    en otro orden produce un contexto distinto.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser mayor que 0")
+
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, ...], str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key_for(chunks: List[SimilarChunk]) -> Tuple[Hashable, ...]:
+        """
+        Calcula la clave de un conjunto de chunks
+
+        Usa el id del chunk; si no lo tiene, el par (document_name, text).
+
+        Args:
+            chunks: Chunks recuperados del vector store
+
+        Returns:
+            Tuple: Clave del cache
+        """
+        return tuple(
+            chunk.chunk_id or (chunk.document_name, chunk.text)
+            for chunk in chunks
+        )
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[str]:
+        """
+        Busca un contexto por clave
+
+        Args:
+            key: Clave calculada con key_for
+
+        Returns:
+            str cacheado o None
+        """
+        context = self._entries.get(key)
+        if context is not None:
+            self._entries.move_to_end(key)
+        return context
+
+    def put(self, key: Tuple[Hashable, ...], context: str) -> None:
+        """
+        Guarda un contexto (desalojando el menos usado si está lleno)
+
+        Args:
+            key: Clave calculada con key_for
+            context: Contexto construido
+        """
+        self._entries[key] = context
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vacía el cache"""
+        self._entries.clear()
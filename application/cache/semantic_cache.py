@@ -0,0 +1,156 @@
+"""
+Semantic Cache - Cache de respuestas RAG por query exacta y por similitud
+"""
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from application.dtos.query_dto import QueryOutput
+
+
+class SemanticCache:
+    """
+    Cache LRU en memoria de respuestas RAG
+
+    Dos niveles de búsqueda:
+    1. Exacta: por query normalizada (QueryInput.normalized_query)
+    2. Semántica: por similitud coseno entre el embedding de la query
+       y los embeddings de las queries ya respondidas
+
+    Los embeddings cacheados se guardan cuantizados a int8 con una escala
+    por fila (4x menos memoria que float32); la query se mantiene en float32.
+
+    Con ttl_seconds las respuestas caducan (p. ej. tras recargar documentos);
+    las entradas caducadas se ignoran y se reemplazan como las demás.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        similarity_threshold: float = 0.97,
+        ttl_seconds: Optional[float] = None
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser mayor que 0")
+
+        self._max_entries = max_entries
+        self._similarity_threshold = similarity_threshold
+        self._ttl_seconds = ttl_seconds
+
+        # query normalizada -> (fila en la matriz, respuesta)
+        self._entries: "OrderedDict[str, Tuple[int, QueryOutput]]" = OrderedDict()
+        # Embeddings normalizados a norma 1 y cuantizados, una fila por entrada
+        self._vectors: Optional[np.ndarray] = None
+        self._scales = np.zeros(max_entries, dtype=np.float32)
+        # Instante (time.monotonic) en que caduca cada fila
+        self._expires_at = np.full(max_entries, np.inf)
+        self._row_keys: List[Optional[str]] = [None] * max_entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_exact(self, key: str) -> Optional[QueryOutput]:
+        """
+        Busca una respuesta por query normalizada
+
+        Args:
+            key: Query normalizada
+
+        Returns:
+            QueryOutput cacheado o None
+        """
+        entry = self._entries.get(key)
+        if entry is None or self._expires_at[entry[0]] <= time.monotonic():
+            return None
+
+        self._entries.move_to_end(key)
+        return self._copy(entry[1])
+
+    def get_similar(self, embedding: List[float]) -> Optional[QueryOutput]:
+        """
+        Busca la respuesta de la query más similar
+
+        Args:
+            embedding: Embedding de la query actual
+
+        Returns:
+            QueryOutput cacheado si la similitud supera el umbral, None si no
+        """
+        query_vector = self._unit_vector(embedding)
+        if query_vector is None or self._vectors is None or not self._entries:
+            return None
+        if query_vector.shape[0] != self._vectors.shape[1]:
+            return None
+
+        # Las filas se ocupan en orden, así que las primeras len() están en uso
+        rows = len(self._entries)
+        similarities = (self._vectors[:rows] @ query_vector) * self._scales[:rows]
+        if self._ttl_seconds is not None:
+            similarities[self._expires_at[:rows] <= time.monotonic()] = -np.inf
+        best_row = int(np.argmax(similarities))
+        if similarities[best_row] < self._similarity_threshold:
+            return None
+
+        key = self._row_keys[best_row]
+        self._entries.move_to_end(key)
+        return self._copy(self._entries[key][1])
+
+    def put(self, key: str, embedding: List[float], output: QueryOutput) -> None:
+        """
+        Guarda una respuesta en el cache (desalojando la menos usada si está lleno)
+
+        Args:
+            key: Query normalizada
+            embedding: Embedding de la query
+            output: Respuesta a cachear
+        """
+        vector = self._unit_vector(embedding)
+        if vector is None:
+            return
+
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            # Primera inserción o cambio de modelo de embeddings
+            self._vectors = np.zeros((self._max_entries, vector.shape[0]), dtype=np.int8)
+            self._entries.clear()
+            self._row_keys = [None] * self._max_entries
+
+        if key in self._entries:
+            row = self._entries.pop(key)[0]
+        elif len(self._entries) >= self._max_entries:
+            _, (row, _) = self._entries.popitem(last=False)
+        else:
+            row = len(self._entries)
+
+        self._vectors[row], self._scales[row] = self._quantize(vector)
+        if self._ttl_seconds is not None:
+            self._expires_at[row] = time.monotonic() + self._ttl_seconds
+        self._row_keys[row] = key
+        self._entries[key] = (row, self._copy(output))
+
+    def clear(self) -> None:
+        """Vacía el cache"""
+        self._entries.clear()
+        self._row_keys = [None] * self._max_entries
+        self._vectors = None
+
+    @staticmethod
+    def _unit_vector(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0:
+            return None
+        return vector / norm
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, np.float32]:
+        # Escala simétrica por vector: el mayor componente se mapea a ±127
+        scale = np.float32(np.abs(vector).max() / 127)
+        return np.round(vector / scale).astype(np.int8), scale
+
+    @staticmethod
+    def _copy(output: QueryOutput) -> QueryOutput:
+        # QueryOutput es mutable: nunca compartir la instancia cacheada
+        return replace(output, sources=list(output.sources))
@@ -1,11 +1,17 @@
 """
 Query DTOs - Data Transfer Objects para consultas RAG
 """
-from dataclasses import dataclass
+import unicodedata
+from dataclasses import dataclass, field
 from typing import List, Optional
 
+import orjson
 
-@dataclass
+# Longitud máxima de una consulta (protege al embedding y al LLM)
+MAX_QUERY_LENGTH = 8000
+
+
+@dataclass(slots=True)
 class QueryInput:
     """
     DTO de entrada para consultas RAG con soporte de sesiones
@@ -14,13 +20,25 @@ class QueryInput:
     """
     query: str
     session_id: Optional[str] = None  # ID de sesión para memoria conversacional
+    _normalized: Optional[str] = field(init=False, default=None, repr=False, compare=False)
+
+    @property
+    def normalized_query(self) -> str:
+        """Query normalizada (NFKC, minúsculas, sin espacios extremos), calculada una vez"""
+        if self._normalized is None:
+            self._normalized = unicodedata.normalize('NFKC', self.query).casefold().strip()
+        return self._normalized
 
     def is_valid(self) -> bool:
-        """Valida que la query no esté vacía"""
-        return bool(self.query and self.query.strip())
+        """Valida que la query no esté vacía ni exceda MAX_QUERY_LENGTH"""
+        return (
+            bool(self.query)
+            and len(self.query) <= MAX_QUERY_LENGTH
+            and not self.query.isspace()
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryOutput:
     """
     DTO de salida para consultas RAG
@@ -40,3 +58,7 @@ class QueryOutput:
             "document_name": self.document_name,
             "download_url": self.download_url
         }
+
+    def to_json(self) -> bytes:
+        """Serializa directamente a JSON (bytes UTF-8) sin diccionario intermedio"""
+        return orjson.dumps(self)
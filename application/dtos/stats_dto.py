@@ -4,8 +4,10 @@ Stats DTOs - Data Transfer Objects para estadísticas
 from dataclasses import dataclass
 from typing import Dict
 
+import orjson
 
-@dataclass
+
+@dataclass(slots=True)
 class StatsOutput:
     """
     DTO de salida para estadísticas del sistema
@@ -27,3 +29,7 @@ class StatsOutput:
             "categories": self.categories,
             "document_types": self.document_types
         }
+
+    def to_json(self) -> bytes:
+        """Serializa directamente a JSON (bytes UTF-8) sin diccionario intermedio"""
+        return orjson.dumps(self)
@@ -1,7 +1,12 @@
 """
 Get Statistics Use Case - Obtiene estadísticas del sistema
 """
+import asyncio
 import logging
+import time
+from dataclasses import replace
+from typing import Optional, Tuple
+
 from application.dtos.stats_dto import StatsOutput
 from domain.interfaces.vector_store import IVectorStore
 
@@ -12,11 +17,16 @@ class GetStatisticsUseCase:
     """
     Caso de uso: Obtener estadísticas del sistema RAG
 
-    Recupera métricas agregadas del vector store.
+    Recupera métricas agregadas del vector store. Con cache_ttl_seconds > 0
+    las estadísticas se reutilizan durante ese tiempo, y las peticiones
+    concurrentes con el cache caducado esperan a una única consulta.
     """
 
-    def __init__(self, vector_store: IVectorStore):
+    def __init__(self, vector_store: IVectorStore, cache_ttl_seconds: float = 0.0):
         self._vector_store = vector_store
+        self._cache_ttl = cache_ttl_seconds
+        self._cached: Optional[Tuple[float, StatsOutput]] = None
+        self._refresh_lock = asyncio.Lock()
 
     async def execute(self) -> StatsOutput:
         """
@@ -25,6 +35,39 @@ class GetStatisticsUseCase:
         Returns:
             StatsOutput: Estadísticas del sistema
         """
+        if self._cache_ttl <= 0:
+            return await self._fetch()
+
+        stats = self._get_cached()
+        if stats is None:
+            async with self._refresh_lock:
+                # Otra petición pudo refrescarlas mientras se esperaba el lock
+                stats = self._get_cached()
+                if stats is None:
+                    stats = await self._fetch()
+                    self._cached = (time.monotonic() + self._cache_ttl, stats)
+        else:
+            logger.debug("Statistics served from cache")
+
+        return self._copy(stats)
+
+    def _get_cached(self) -> Optional[StatsOutput]:
+        if self._cached is None:
+            return None
+        expires_at, stats = self._cached
+        return stats if time.monotonic() < expires_at else None
+
+    @staticmethod
+    def _copy(stats: StatsOutput) -> StatsOutput:
+        """Copia las estadísticas para que el llamador no pueda alterar las cacheadas"""
+        return replace(
+            stats,
+            categories=dict(stats.categories) if stats.categories is not None else None,
+            document_types=dict(stats.document_types) if stats.document_types is not None else None
+        )
+
+    async def _fetch(self) -> StatsOutput:
+        """Consulta las estadísticas al vector store"""
         logger.info("Retrieving system statistics...")
 
         try:
@@ -41,12 +84,13 @@ class GetStatisticsUseCase:
             )
 
             logger.info(
-                f"Statistics retrieved: {stats.total_documents} documents, "
-                f"{stats.total_chunks} chunks"
+                "Statistics retrieved: %s documents, %s chunks",
+                stats.total_documents,
+                stats.total_chunks
             )
 
             return stats
 
         except Exception as e:
-            logger.error(f"Error retrieving statistics: {e}", exc_info=True)
+            logger.error("Error retrieving statistics: %s", e, exc_info=True)
             raise
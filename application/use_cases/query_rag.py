@@ -1,19 +1,210 @@
 """
 Query RAG Use Case - Procesa consultas del usuario usando RAG
 """
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from datetime import datetime
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Union
+from datetime import datetime, timedelta
 from application.dtos.query_dto import QueryInput, QueryOutput
+from application.cache.semantic_cache import SemanticCache
+from application.cache.context_cache import ContextCache
 from domain.interfaces.embedding_service import IEmbeddingService
 from domain.interfaces.vector_store import IVectorStore
 from domain.interfaces.chat_service import IChatService
 from domain.interfaces.chat_session_store import IChatSessionStore
 from domain.entities.query_result import SimilarChunk
 from domain.entities.chat_message import ChatMessage
+from core.exceptions import SessionAlreadyExistsError
 
 logger = logging.getLogger(__name__)
 
+# Palabras clave de comandos especiales, en orden de prioridad
+# (la ayuda con el RAG debe ganar a la ayuda general)
+_COMMAND_KEYWORDS = (
+    ('rag_help', ('ayuda con el rag', 'cómo preguntar')),
+    ('faq', ('faq', 'preguntas frecuentes')),
+    ('topics', ('temas disponibles', 'qué temas')),
+    ('help', ('ayuda', 'ayúdame', 'qué puedes hacer', 'que puedes hacer',
+              'qué temas', 'que temas', 'sobre qué', 'sobre que',
+              'de qué', 'de que', 'help', 'opciones', 'menú', 'menu')),
+)
+
+_COMMAND_PRIORITY = {category: i for i, (category, _) in enumerate(_COMMAND_KEYWORDS)}
+
+# Un único patrón compilado: cada categoría es un grupo con nombre y el
+# lookahead permite detectar coincidencias solapadas en una sola pasada
+_COMMAND_PATTERN = re.compile('(?=' + '|'.join(
+    f"(?P<{category}>{'|'.join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))})"
+    for category, keywords in _COMMAND_KEYWORDS
+) + ')')
+
+# Respuestas HTML estáticas de los comandos especiales
+_HELP_MSG = """
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 10px; color: white; margin-bottom: 15px;">
+    <h2 style="margin: 0 0 10px 0; font-size: 24px;">Asistente de Trámites Municipales</h2>
+    <p style="margin: 0; opacity: 0.9;">Tu guía inteligente para procedimientos del municipio</p>
+</div>
+
+<p><strong>📋 CONSULTAS FRECUENTES</strong></p>
+<p>Haz clic o escribe una de estas opciones para obtener ayuda rápida:</p>
+
+<div style="display: grid; gap: 10px; margin: 15px 0;">
+    <div style="background: #f0f9ff; padding: 12px; border-radius: 8px; border-left: 4px solid #3b82f6;">
+        <strong>1️⃣ Preguntas Frecuentes</strong><br/>
+        <em style="color: #64748b;">Consultas más comunes sobre trámites</em>
+    </div>
+
+    <div style="background: #fef3c7; padding: 12px; border-radius: 8px; border-left: 4px solid #f59e0b;">
+        <strong>2️⃣ Ayuda con el RAG</strong><br/>
+        <em style="color: #64748b;">Aprende a hacer mejores preguntas</em>
+    </div>
+
+    <div style="background: #f0fdf4; padding: 12px; border-radius: 8px; border-left: 4px solid #10b981;">
+        <strong>3️⃣ Temas disponibles</strong><br/>
+        <em style="color: #64748b;">Lista de todos los temas que manejo</em>
+    </div>
+</div>
+
+<p style="margin-top: 20px;"><strong>💡 Ejemplos de preguntas directas:</strong></p>
+<ul style="line-height: 1.8;">
+    <li>"¿Cómo saco una licencia de funcionamiento para una bodega?"</li>
+    <li>"¿Qué requisitos necesito para comercio ambulatorio?"</li>
+    <li>"¿Cuánto cuesta una licencia provisional?"</li>
+    <li>"¿Dónde descargo el formato de solicitud?"</li>
+</ul>
+
+<p style="background: #fef2f2; padding: 10px; border-radius: 6px; border-left: 3px solid #ef4444;">
+    ⚠️ <strong>Importante:</strong> Solo puedo responder preguntas sobre trámites municipales basándome en los documentos oficiales cargados.
+</p>
+"""
+
+_FAQ_MSG = """
+<h3 style="color: #3b82f6; margin-bottom: 15px;">❓ Preguntas Frecuentes</h3>
+
+<div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
+    <strong>1. ¿Qué es una licencia de funcionamiento?</strong>
+    <p>Es la autorización municipal para realizar actividades económicas en un establecimiento.</p>
+</div>
+
+<div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
+    <strong>2. ¿Cuánto tiempo demora el trámite?</strong>
+    <p>Depende del tipo: licencias automáticas (1 día), con inspección (15 días hábiles).</p>
+</div>
+
+<div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
+    <strong>3. ¿Dónde presento los documentos?</strong>
+    <p>En la Oficina de Trámite Documentario del municipio o virtualmente según disponibilidad.</p>
+</div>
+
+<p style="margin-top: 20px;"><strong>💬 Para consultas específicas, escribe tu pregunta directamente.</strong></p>
+"""
+
+_TOPICS_MSG = """
+<h3 style="color: #10b981; margin-bottom: 15px;">📚 Temas Disponibles</h3>
+
+<div style="display: grid; gap: 15px;">
+    <div style="background: #f0f9ff; padding: 15px; border-radius: 8px; border-left: 4px solid #3b82f6;">
+        <strong>🏪 Licencias de Funcionamiento</strong>
+        <ul style="margin: 10px 0 0 20px;">
+            <li>Licencias para bodegas y comercio menor</li>
+            <li>Licencias para establecimientos medianos y grandes</li>
+            <li>Licencias provisionales</li>
+            <li>Requisitos y procedimientos</li>
+        </ul>
+    </div>
+
+    <div style="background: #fef3c7; padding: 15px; border-radius: 8px; border-left: 4px solid #f59e0b;">
+        <strong>📋 Normativas Municipales</strong>
+        <ul style="margin: 10px 0 0 20px;">
+            <li>Ordenanzas municipales</li>
+            <li>Ley de tributación municipal</li>
+            <li>Reglamentos y decretos</li>
+        </ul>
+    </div>
+
+    <div style="background: #f0fdf4; padding: 15px; border-radius: 8px; border-left: 4px solid #10b981;">
+        <strong>📝 Formularios y Guías</strong>
+        <ul style="margin: 10px 0 0 20px;">
+            <li>Formatos de solicitud</li>
+            <li>Guías paso a paso</li>
+            <li>Declaraciones juradas</li>
+        </ul>
+    </div>
+</div>
+
+<p style="margin-top: 20px;"><strong>💡 Escribe tu pregunta sobre cualquiera de estos temas.</strong></p>
+"""
+
+_RAG_HELP_MSG = """
+<h3>De qué trata este sistema RAG</h3>
+
+<p>Este es un sistema de consulta inteligente que busca en documentos municipales para responder tus preguntas. Funciona en 3 pasos:</p>
+
+<ol>
+    <li>Recibes tu pregunta y la analiza</li>
+    <li>Busca los documentos más relevantes en la base de datos</li>
+    <li>Genera una respuesta basándose en la información encontrada</li>
+</ol>
+
+<h4>Cómo hacer buenas preguntas</h4>
+
+<p><strong>Preguntas que funcionan bien:</strong></p>
+<ul>
+    <li>"¿Qué requisitos necesito para una licencia de funcionamiento?"</li>
+    <li>"¿Cuánto cuesta renovar una licencia comercial?"</li>
+    <li>"¿Dónde puedo descargar el formulario de declaración jurada?"</li>
+    <li>"¿Qué documentos necesito para abrir una bodega?"</li>
+</ul>
+
+<p><strong>Preguntas poco efectivas:</strong></p>
+<ul>
+    <li>"Licencia" - Muy general, no especifica qué necesitas saber</li>
+    <li>"Ayuda" - No indica sobre qué tema</li>
+    <li>"Información" - Demasiado vago</li>
+</ul>
+
+<h4>Consejos para mejores resultados</h4>
+<ul>
+    <li>Sé específico sobre el trámite que te interesa</li>
+    <li>Menciona el tipo de negocio o establecimiento si aplica</li>
+    <li>Pregunta por algo concreto: requisitos, costos, plazos, formularios</li>
+    <li>Usa preguntas completas en lugar de palabras sueltas</li>
+</ul>
+
+<h4>Importante saber</h4>
+<ul>
+    <li>Solo puedo responder con información que está en los documentos cargados</li>
+    <li>No invento respuestas - si no encuentro información, te lo indicaré</li>
+    <li>Entre más específica sea tu pregunta, mejor será la respuesta</li>
+</ul>
+"""
+
+_NO_RESULTS_MSG = """
+<div style="background: #fef2f2; padding: 20px; border-radius: 10px; border-left: 4px solid #ef4444;">
+    <h3 style="color: #ef4444; margin-top: 0;">❌ No se encontraron resultados</h3>
+    <p>Lo siento, no encontré información relevante para tu consulta en los documentos disponibles.</p>
+
+    <p><strong>💡 Sugerencias:</strong></p>
+    <ul>
+        <li>Reformula tu pregunta con otros términos</li>
+        <li>Sé más específico sobre el trámite que buscas</li>
+        <li>Escribe <strong>"ayuda"</strong> para ver los temas disponibles</li>
+    </ul>
+</div>
+"""
+
+
+@dataclass(slots=True)
+class _PreparedQuery:
+    """Estado del pipeline RAG justo antes de llamar al LLM"""
+    query_embedding: List[float]
+    conversation_history: List[ChatMessage]
+    context: str
+    sources: List[str]
+    cache_key: Optional[str]  # None si la respuesta no debe cachearse
+
 
 class QueryRAGUseCase:
     """
@@ -21,7 +212,7 @@ class QueryRAGUseCase:
 
     Orquesta el flujo completo:
     1. Cargar historial de conversación (si existe session_id)
-    2. Generar embedding de la query
+    2. Generar embedding de la query (en paralelo con el paso 1)
     3. Buscar chunks similares en vector store
     4. Construir contexto
     5. Generar respuesta con LLM (incluyendo historial)
@@ -36,7 +227,9 @@ class QueryRAGUseCase:
         session_store: Optional[IChatSessionStore] = None,
         similarity_threshold: float = 0.4,
         top_k: int = 5,
-        max_history_messages: int = 10
+        max_history_messages: int = 10,
+        semantic_cache: Optional[SemanticCache] = None,
+        context_cache: Optional[ContextCache] = None
     ):
         self._embedding_service = embedding_service
         self._vector_store = vector_store
@@ -45,6 +238,25 @@ class QueryRAGUseCase:
         self._similarity_threshold = similarity_threshold
         self._top_k = top_k
         self._max_history_messages = max_history_messages
+        self._semantic_cache = semantic_cache
+        self._context_cache = context_cache
+
+    def classify(self, input_dto: QueryInput) -> Optional[QueryOutput]:
+        """
+        Resuelve sin I/O las consultas que no necesitan el pipeline RAG
+
+        Solo aplica a comandos especiales sin sesión: con sesión la
+        interacción debe guardarse y hay que pasar por execute().
+
+        Args:
+            input_dto: QueryInput con la consulta del usuario
+
+        Returns:
+            QueryOutput si la consulta se resuelve de forma síncrona, None si no
+        """
+        if self._session_store is not None and input_dto.session_id:
+            return None
+        return self._handle_special_commands(input_dto.normalized_query)
 
     async def execute(self, input_dto: QueryInput) -> QueryOutput:
         """
@@ -56,110 +268,250 @@ class QueryRAGUseCase:
         Returns:
             QueryOutput: Respuesta con answer, sources, etc.
         """
-        logger.info(f"\n{'='*50}")
-        logger.info(f"[STEP 1] User query: '{input_dto.query}'")
-        if input_dto.session_id:
-            logger.info(f"[STEP 1] Session ID: {input_dto.session_id}")
-
         try:
-            # 0. Cargar historial de conversación si existe session_id
-            conversation_history: List[ChatMessage] = []
-            if self._session_store and input_dto.session_id:
-                conversation_history = await self._load_conversation_history(
-                    input_dto.session_id
-                )
-                logger.info(f"[STEP 0] Loaded {len(conversation_history)} previous messages")
-
-            # Detectar comandos especiales (ayuda, FAQ, etc.)
-            special_response = self._handle_special_commands(input_dto.query)
-            if special_response:
-                # Guardar en sesión si existe
-                if self._session_store and input_dto.session_id:
-                    await self._save_interaction(
-                        input_dto.session_id,
-                        input_dto.query,
-                        special_response.answer,
-                        []
-                    )
-                return special_response
-
-            # 1. Generar embedding de la query
-            logger.info("[STEP 2] Generating query embedding...")
-            query_embedding = await self._embedding_service.generate_query_embedding(
-                input_dto.query
-            )
-            logger.info(f"[STEP 2] Generated embedding with {len(query_embedding)} dimensions")
-
-            # 2. Buscar chunks similares
-            logger.info(
-                f"[STEP 3] Searching similar chunks (threshold={self._similarity_threshold}, "
-                f"limit={self._top_k})..."
-            )
-            similar_chunks = await self._vector_store.search_similar_chunks(
-                embedding=query_embedding,
-                threshold=self._similarity_threshold,
-                limit=self._top_k
-            )
-            logger.info(f"[STEP 3] Found {len(similar_chunks)} similar chunks")
-
-            # 3. Verificar si se encontraron resultados
-            if not similar_chunks:
-                logger.warning("[STEP 3] No similar chunks found")
-                no_results_answer = self._get_no_results_message()
-
-                # Guardar en sesión si existe
-                if self._session_store and input_dto.session_id:
-                    await self._save_interaction(
-                        input_dto.session_id,
-                        input_dto.query,
-                        no_results_answer,
-                        []
-                    )
-
-                return QueryOutput(
-                    answer=no_results_answer,
-                    sources=[]
-                )
-
-            # 4. Construir contexto
-            logger.info("[STEP 4] Building context from chunks...")
-            context = self._build_context(similar_chunks)
-            logger.info(f"[STEP 4] Context built: {len(context)} characters")
+            prepared = await self._prepare(input_dto)
+            if isinstance(prepared, QueryOutput):
+                return prepared
 
             # 5. Generar respuesta (CON HISTORIAL)
-            logger.info("[STEP 5] Generating answer with LLM (with conversation history)...")
+            logger.debug("[STEP 5] Generating answer with LLM (with conversation history)...")
             answer = await self._chat_service.generate_answer(
                 query=input_dto.query,
-                context=context,
-                conversation_history=conversation_history
+                context=prepared.context,
+                conversation_history=prepared.conversation_history
             )
-            logger.info(f"[STEP 5] Answer generated: {len(answer)} characters")
+            logger.debug("[STEP 5] Answer generated: %d characters", len(answer))
+
+            return await self._finish(input_dto, prepared, answer)
+
+        except Exception as e:
+            logger.error("Error processing query: %s", e, exc_info=True)
+            raise
+
+    async def execute_stream(self, input_dto: QueryInput) -> AsyncIterator[Union[str, QueryOutput]]:
+        """
+        Ejecuta la consulta RAG emitiendo la respuesta del LLM a medida que se genera
+
+        Produce los fragmentos de texto de la respuesta y, al final, el
+        QueryOutput completo (con fuentes). Los comandos especiales, las
+        respuestas cacheadas y la ausencia de resultados solo producen el
+        QueryOutput.
+
+        Args:
+            input_dto: QueryInput con la consulta del usuario (y session_id opcional)
+
+        Yields:
+            str con cada fragmento de la respuesta y, como último elemento, QueryOutput
+        """
+        try:
+            prepared = await self._prepare(input_dto)
+            if isinstance(prepared, QueryOutput):
+                yield prepared
+                return
+
+            logger.debug("[STEP 5] Streaming answer with LLM (with conversation history)...")
+            parts: List[str] = []
+            async for part in self._chat_service.stream_answer(
+                query=input_dto.query,
+                context=prepared.context,
+                conversation_history=prepared.conversation_history
+            ):
+                parts.append(part)
+                yield part
+
+            yield await self._finish(input_dto, prepared, "".join(parts))
+
+        except Exception as e:
+            logger.error("Error processing query: %s", e, exc_info=True)
+            raise
 
-            # 6. Extraer fuentes únicas
-            sources = list(set(chunk.get('filename', '') for chunk in similar_chunks))
+    async def _prepare(self, input_dto: QueryInput) -> Union[QueryOutput, _PreparedQuery]:
+        """
+        Ejecuta el pipeline previo al LLM (comandos, cache, historial, búsqueda y contexto)
+
+        Args:
+            input_dto: QueryInput con la consulta del usuario
+
+        Returns:
+            QueryOutput si la consulta ya quedó resuelta, o _PreparedQuery
+            con lo necesario para generar la respuesta
+        """
+        logger.info("[STEP 1] User query: '%s'", input_dto.query)
+        if input_dto.session_id:
+            logger.info("[STEP 1] Session ID: %s", input_dto.session_id)
 
-            # 7. Guardar interacción en la sesión si existe
-            if self._session_store and input_dto.session_id:
+        # Detectar comandos especiales (ayuda, FAQ, etc.) antes de cualquier I/O
+        special_response = self._handle_special_commands(input_dto.normalized_query)
+        if special_response:
+            # Guardar en sesión si existe
+            if self._session_store is not None and input_dto.session_id:
                 await self._save_interaction(
                     input_dto.session_id,
                     input_dto.query,
-                    answer,
-                    sources
+                    special_response.answer,
+                    []
+                )
+            return special_response
+
+        has_session = self._session_store is not None and bool(input_dto.session_id)
+        cache_key = (
+            input_dto.normalized_query
+            if self._semantic_cache is not None else None
+        )
+
+        # Sin sesión no hay historial: el cache exacto se consulta sin I/O
+        if cache_key is not None and not has_session:
+            cached_response = self._semantic_cache.get_exact(cache_key)
+            if cached_response:
+                logger.info("[CACHE] Exact cache hit")
+                return await self._return_cached(input_dto, cached_response)
+
+        # 0-1. Cargar historial y generar embedding de la query en paralelo
+        logger.debug("[STEP 2] Generating query embedding...")
+        embedding_task = self._embedding_service.generate_query_embedding(
+            input_dto.query
+        )
+        conversation_history: List[ChatMessage] = []
+        if has_session:
+            conversation_history, query_embedding = await asyncio.gather(
+                self._load_conversation_history(input_dto.session_id),
+                embedding_task
+            )
+            logger.debug("[STEP 0] Loaded %d previous messages", len(conversation_history))
+        else:
+            query_embedding = await embedding_task
+        logger.debug("[STEP 2] Generated embedding with %d dimensions", len(query_embedding))
+
+        # Las respuestas solo se cachean sin historial: con historial
+        # la misma pregunta puede tener otra respuesta
+        use_cache = cache_key is not None and not conversation_history
+        if use_cache:
+            cached_response = (
+                self._semantic_cache.get_exact(cache_key)
+                or self._semantic_cache.get_similar(query_embedding)
+            )
+            if cached_response:
+                logger.info("[CACHE] Cache hit")
+                return await self._return_cached(input_dto, cached_response)
+
+        # 2. Buscar chunks similares
+        logger.debug(
+            "[STEP 3] Searching similar chunks (threshold=%s, limit=%d)...",
+            self._similarity_threshold,
+            self._top_k
+        )
+        similar_chunks = await self._vector_store.search_similar_chunks(
+            embedding=query_embedding,
+            threshold=self._similarity_threshold,
+            limit=self._top_k
+        )
+        logger.info("[STEP 3] Found %d similar chunks", len(similar_chunks))
+
+        # 3. Verificar si se encontraron resultados
+        if not similar_chunks:
+            logger.warning("[STEP 3] No similar chunks found")
+            no_results_answer = self._get_no_results_message()
+
+            # Guardar en sesión si existe
+            if self._session_store is not None and input_dto.session_id:
+                await self._save_interaction(
+                    input_dto.session_id,
+                    input_dto.query,
+                    no_results_answer,
+                    []
                 )
-                logger.info(f"[STEP 6] Saved interaction to session {input_dto.session_id}")
-
-            logger.info(f"[STEP 7] Query completed successfully")
-            logger.info(f"{'='*50}\n")
 
             return QueryOutput(
-                answer=answer,
-                sources=sources,
-                document_name=sources[0] if sources else None
+                answer=no_results_answer,
+                sources=[]
             )
 
-        except Exception as e:
-            logger.error(f"Error processing query: {e}", exc_info=True)
-            raise
+        # 4. Construir contexto
+        logger.debug("[STEP 4] Building context from chunks...")
+        context = self._build_context(similar_chunks)
+        logger.debug("[STEP 4] Context built: %d characters", len(context))
+
+        # 6. Extraer fuentes únicas (en orden de relevancia)
+        sources = [
+            source for source in dict.fromkeys(
+                chunk.document_name for chunk in similar_chunks
+            )
+            if source
+        ]
+
+        return _PreparedQuery(
+            query_embedding=query_embedding,
+            conversation_history=conversation_history,
+            context=context,
+            sources=sources,
+            cache_key=cache_key if use_cache else None
+        )
+
+    async def _finish(
+        self,
+        input_dto: QueryInput,
+        prepared: _PreparedQuery,
+        answer: str
+    ) -> QueryOutput:
+        """
+        Guarda la interacción, construye el QueryOutput y lo cachea si aplica
+
+        Args:
+            input_dto: QueryInput de la consulta actual
+            prepared: Resultado de _prepare
+            answer: Respuesta generada por el LLM
+
+        Returns:
+            QueryOutput final
+        """
+        sources = prepared.sources
+
+        # 7. Guardar interacción en la sesión si existe
+        if self._session_store is not None and input_dto.session_id:
+            await self._save_interaction(
+                input_dto.session_id,
+                input_dto.query,
+                answer,
+                sources
+            )
+            logger.debug("[STEP 6] Saved interaction to session %s", input_dto.session_id)
+
+        logger.info("[STEP 7] Query completed successfully")
+
+        output = QueryOutput(
+            answer=answer,
+            sources=sources,
+            document_name=sources[0] if sources else None
+        )
+
+        if prepared.cache_key is not None:
+            self._semantic_cache.put(prepared.cache_key, prepared.query_embedding, output)
+
+        return output
+
+    async def _return_cached(
+        self,
+        input_dto: QueryInput,
+        cached_response: QueryOutput
+    ) -> QueryOutput:
+        """
+        Devuelve una respuesta cacheada guardándola en la sesión si existe
+
+        Args:
+            input_dto: QueryInput de la consulta actual
+            cached_response: Respuesta obtenida del cache
+
+        Returns:
+            QueryOutput cacheado
+        """
+        if self._session_store is not None and input_dto.session_id:
+            await self._save_interaction(
+                input_dto.session_id,
+                input_dto.query,
+                cached_response.answer,
+                cached_response.sources
+            )
+        return cached_response
 
     async def _load_conversation_history(
         self,
@@ -175,14 +527,18 @@ class QueryRAGUseCase:
             Lista de mensajes (limitada a max_history_messages)
         """
         try:
-            if not self._session_store:
+            if self._session_store is None:
                 return []
 
             # Verificar si la sesión existe, si no, crearla
             exists = await self._session_store.session_exists(session_id)
             if not exists:
-                logger.info(f"Creating new session: {session_id}")
-                await self._session_store.create_session(session_id)
+                logger.info("Creating new session: %s", session_id)
+                try:
+                    await self._session_store.create_session(session_id)
+                except SessionAlreadyExistsError:
+                    # Otra petición la creó entre la comprobación y la escritura
+                    pass
                 return []
 
             # Cargar mensajes recientes
@@ -194,7 +550,7 @@ class QueryRAGUseCase:
             return messages
 
         except Exception as e:
-            logger.error(f"Error loading conversation history: {e}")
+            logger.error("Error loading conversation history: %s", e)
             return []  # En caso de error, continuar sin historial
 
     async def _save_interaction(
@@ -214,39 +570,46 @@ class QueryRAGUseCase:
             sources: Fuentes usadas
         """
         try:
-            if not self._session_store:
+            if self._session_store is None:
                 return
 
             # Crear sesión si no existe
             exists = await self._session_store.session_exists(session_id)
             if not exists:
-                await self._session_store.create_session(session_id)
-
-            # Guardar mensaje del usuario
+                try:
+                    await self._session_store.create_session(session_id)
+                except SessionAlreadyExistsError:
+                    # Otra petición la creó entre la comprobación y la escritura
+                    pass
+
+            # Guardar mensaje del usuario y respuesta del asistente en una sola
+            # escritura; la respuesta va 1 µs después para que el historial
+            # (ordenado por created_at) siempre la devuelva tras la pregunta
+            now = datetime.now()
             user_message = ChatMessage(
                 role='user',
                 content=user_query,
-                created_at=datetime.now()
+                created_at=now
             )
-            await self._session_store.add_message(session_id, user_message)
-
-            # Guardar respuesta del asistente
             assistant_message = ChatMessage(
                 role='assistant',
                 content=assistant_answer,
-                created_at=datetime.now(),
+                created_at=now + timedelta(microseconds=1),
                 metadata={'sources': sources} if sources else None
             )
-            await self._session_store.add_message(session_id, assistant_message)
+            await self._session_store.add_messages(
+                session_id,
+                [user_message, assistant_message]
+            )
 
-            logger.info(f"Saved interaction to session {session_id}")
+            logger.info("Saved interaction to session %s", session_id)
 
         except Exception as e:
-            logger.error(f"Error saving interaction: {e}")
+            logger.error("Error saving interaction: %s", e)
             # No fallar el request si no se puede guardar
             pass
 
-    def _build_context(self, chunks: List[Dict]) -> str:
+    def _build_context(self, chunks: List[SimilarChunk]) -> str:
         """
         Construye contexto a partir de chunks similares
 
@@ -256,28 +619,43 @@ class QueryRAGUseCase:
         Returns:
             str: Contexto formateado para el LLM
         """
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            doc_name = chunk.get('filename', 'Documento Desconocido')
-            text = chunk.get('chunk_text', '')
-            context_parts.append(f"[Fuente {i}: {doc_name}]\n{text}\n")
-
-        return "\n".join(context_parts)
-
-    def _handle_special_commands(self, query: str) -> QueryOutput | None:
+        if self._context_cache is not None:
+            key = ContextCache.key_for(chunks)
+            context = self._context_cache.get(key)
+            if context is not None:
+                return context
+
+        context = "\n".join(
+            f"[Fuente {i}: {chunk.document_name or 'Documento Desconocido'}]\n"
+            f"{chunk.text}\n"
+            for i, chunk in enumerate(chunks, 1)
+        )
+
+        if self._context_cache is not None:
+            self._context_cache.put(key, context)
+        return context
+
+    def _handle_special_commands(self, normalized_query: str) -> QueryOutput | None:
         """
         Maneja comandos especiales (ayuda, FAQ, temas disponibles)
 
         Args:
-            query: Query del usuario
+            normalized_query: Query del usuario ya normalizada
+                (QueryInput.normalized_query)
 
         Returns:
             QueryOutput si es comando especial, None si no
         """
-        query_lower = query.lower().strip()
-
-        # 1. Ayuda con el RAG (debe ir ANTES que ayuda general)
-        if 'ayuda con el rag' in query_lower or 'cómo preguntar' in query_lower:
+        # Una sola pasada sobre la query; gana la categoría de mayor prioridad
+        category = min(
+            (match.lastgroup for match in _COMMAND_PATTERN.finditer(normalized_query)),
+            key=_COMMAND_PRIORITY.__getitem__,
+            default=None
+        )
+        if category is None:
+            return None
+
+        if category == 'rag_help':
             logger.info("[RAG_HELP] RAG help requested")
             return QueryOutput(
                 answer=self._get_rag_help_message(),
@@ -285,8 +663,7 @@ class QueryRAGUseCase:
                 document_name="Guía Técnica RAG"
             )
 
-        # 2. FAQ
-        if 'faq' in query_lower or 'preguntas frecuentes' in query_lower:
+        if category == 'faq':
             logger.info("[FAQ] FAQ requested")
             return QueryOutput(
                 answer=self._get_faq_message(),
@@ -294,8 +671,7 @@ class QueryRAGUseCase:
                 document_name="Preguntas Frecuentes"
             )
 
-        # 3. Temas disponibles
-        if 'temas disponibles' in query_lower or 'qué temas' in query_lower:
+        if category == 'topics':
             logger.info("[TOPICS] Topics list requested")
             return QueryOutput(
                 answer=self._get_topics_message(),
@@ -303,181 +679,29 @@ class QueryRAGUseCase:
                 document_name="Temas Disponibles"
             )
 
-        # 4. Ayuda general (debe ir al FINAL)
-        help_keywords = ['ayuda', 'ayúdame', 'qué puedes hacer', 'que puedes hacer',
-                        'qué temas', 'que temas', 'sobre qué', 'sobre que',
-                        'de qué', 'de que', 'help', 'opciones', 'menú', 'menu']
-
-        if any(keyword in query_lower for keyword in help_keywords):
-            logger.info("[HELP] Help message requested")
-            return QueryOutput(
-                answer=self._get_help_message(),
-                sources=[],
-                document_name="Sistema de Ayuda"
-            )
-
-        return None
+        logger.info("[HELP] Help message requested")
+        return QueryOutput(
+            answer=self._get_help_message(),
+            sources=[],
+            document_name="Sistema de Ayuda"
+        )
 
     def _get_help_message(self) -> str:
         """Mensaje de ayuda general"""
-        return """
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 10px; color: white; margin-bottom: 15px;">
-            <h2 style="margin: 0 0 10px 0; font-size: 24px;">Asistente de Trámites Municipales</h2>
-            <p style="margin: 0; opacity: 0.9;">Tu guía inteligente para procedimientos del municipio</p>
-        </div>
-
-        <p><strong>📋 CONSULTAS FRECUENTES</strong></p>
-        <p>Haz clic o escribe una de estas opciones para obtener ayuda rápida:</p>
-
-        <div style="display: grid; gap: 10px; margin: 15px 0;">
-            <div style="background: #f0f9ff; padding: 12px; border-radius: 8px; border-left: 4px solid #3b82f6;">
-                <strong>1️⃣ Preguntas Frecuentes</strong><br/>
-                <em style="color: #64748b;">Consultas más comunes sobre trámites</em>
-            </div>
-
-            <div style="background: #fef3c7; padding: 12px; border-radius: 8px; border-left: 4px solid #f59e0b;">
-                <strong>2️⃣ Ayuda con el RAG</strong><br/>
-                <em style="color: #64748b;">Aprende a hacer mejores preguntas</em>
-            </div>
-
-            <div style="background: #f0fdf4; padding: 12px; border-radius: 8px; border-left: 4px solid #10b981;">
-                <strong>3️⃣ Temas disponibles</strong><br/>
-                <em style="color: #64748b;">Lista de todos los temas que manejo</em>
-            </div>
-        </div>
-
-        <p style="margin-top: 20px;"><strong>💡 Ejemplos de preguntas directas:</strong></p>
-        <ul style="line-height: 1.8;">
-            <li>"¿Cómo saco una licencia de funcionamiento para una bodega?"</li>
-            <li>"¿Qué requisitos necesito para comercio ambulatorio?"</li>
-            <li>"¿Cuánto cuesta una licencia provisional?"</li>
-            <li>"¿Dónde descargo el formato de solicitud?"</li>
-        </ul>
-
-        <p style="background: #fef2f2; padding: 10px; border-radius: 6px; border-left: 3px solid #ef4444;">
-            ⚠️ <strong>Importante:</strong> Solo puedo responder preguntas sobre trámites municipales basándome en los documentos oficiales cargados.
-        </p>
-        """
+        return _HELP_MSG
 
     def _get_faq_message(self) -> str:
         """Mensaje de FAQ"""
-        return """
-        <h3 style="color: #3b82f6; margin-bottom: 15px;">❓ Preguntas Frecuentes</h3>
-
-        <div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
-            <strong>1. ¿Qué es una licencia de funcionamiento?</strong>
-            <p>Es la autorización municipal para realizar actividades económicas en un establecimiento.</p>
-        </div>
-
-        <div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
-            <strong>2. ¿Cuánto tiempo demora el trámite?</strong>
-            <p>Depende del tipo: licencias automáticas (1 día), con inspección (15 días hábiles).</p>
-        </div>
-
-        <div style="background: #f8fafc; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
-            <strong>3. ¿Dónde presento los documentos?</strong>
-            <p>En la Oficina de Trámite Documentario del municipio o virtualmente según disponibilidad.</p>
-        </div>
-
-        <p style="margin-top: 20px;"><strong>💬 Para consultas específicas, escribe tu pregunta directamente.</strong></p>
-        """
+        return _FAQ_MSG
 
     def _get_topics_message(self) -> str:
         """Mensaje de temas disponibles"""
-        return """
-        <h3 style="color: #10b981; margin-bottom: 15px;">📚 Temas Disponibles</h3>
-
-        <div style="display: grid; gap: 15px;">
-            <div style="background: #f0f9ff; padding: 15px; border-radius: 8px; border-left: 4px solid #3b82f6;">
-                <strong>🏪 Licencias de Funcionamiento</strong>
-                <ul style="margin: 10px 0 0 20px;">
-                    <li>Licencias para bodegas y comercio menor</li>
-                    <li>Licencias para establecimientos medianos y grandes</li>
-                    <li>Licencias provisionales</li>
-                    <li>Requisitos y procedimientos</li>
-                </ul>
-            </div>
-
-            <div style="background: #fef3c7; padding: 15px; border-radius: 8px; border-left: 4px solid #f59e0b;">
-                <strong>📋 Normativas Municipales</strong>
-                <ul style="margin: 10px 0 0 20px;">
-                    <li>Ordenanzas municipales</li>
-                    <li>Ley de tributación municipal</li>
-                    <li>Reglamentos y decretos</li>
-                </ul>
-            </div>
-
-            <div style="background: #f0fdf4; padding: 15px; border-radius: 8px; border-left: 4px solid #10b981;">
-                <strong>📝 Formularios y Guías</strong>
-                <ul style="margin: 10px 0 0 20px;">
-                    <li>Formatos de solicitud</li>
-                    <li>Guías paso a paso</li>
-                    <li>Declaraciones juradas</li>
-                </ul>
-            </div>
-        </div>
-
-        <p style="margin-top: 20px;"><strong>💡 Escribe tu pregunta sobre cualquiera de estos temas.</strong></p>
-        """
+        return _TOPICS_MSG
 
     def _get_rag_help_message(self) -> str:
         """Mensaje de ayuda sobre cómo usar el RAG"""
-        return """
-        <h3>De qué trata este sistema RAG</h3>
-
-        <p>Este es un sistema de consulta inteligente que busca en documentos municipales para responder tus preguntas. Funciona en 3 pasos:</p>
-
-        <ol>
-            <li>Recibes tu pregunta y la analiza</li>
-            <li>Busca los documentos más relevantes en la base de datos</li>
-            <li>Genera una respuesta basándose en la información encontrada</li>
-        </ol>
-
-        <h4>Cómo hacer buenas preguntas</h4>
-
-        <p><strong>Preguntas que funcionan bien:</strong></p>
-        <ul>
-            <li>"¿Qué requisitos necesito para una licencia de funcionamiento?"</li>
-            <li>"¿Cuánto cuesta renovar una licencia comercial?"</li>
-            <li>"¿Dónde puedo descargar el formulario de declaración jurada?"</li>
-            <li>"¿Qué documentos necesito para abrir una bodega?"</li>
-        </ul>
-
-        <p><strong>Preguntas poco efectivas:</strong></p>
-        <ul>
-            <li>"Licencia" - Muy general, no especifica qué necesitas saber</li>
-            <li>"Ayuda" - No indica sobre qué tema</li>
-            <li>"Información" - Demasiado vago</li>
-        </ul>
-
-        <h4>Consejos para mejores resultados</h4>
-        <ul>
-            <li>Sé específico sobre el trámite que te interesa</li>
-            <li>Menciona el tipo de negocio o establecimiento si aplica</li>
-            <li>Pregunta por algo concreto: requisitos, costos, plazos, formularios</li>
-            <li>Usa preguntas completas en lugar de palabras sueltas</li>
-        </ul>
-
-        <h4>Importante saber</h4>
-        <ul>
-            <li>Solo puedo responder con información que está en los documentos cargados</li>
-            <li>No invento respuestas - si no encuentro información, te lo indicaré</li>
-            <li>Entre más específica sea tu pregunta, mejor será la respuesta</li>
-        </ul>
-        """
+        return _RAG_HELP_MSG
 
     def _get_no_results_message(self) -> str:
         """Mensaje cuando no se encuentran resultados"""
-        return """
-        <div style="background: #fef2f2; padding: 20px; border-radius: 10px; border-left: 4px solid #ef4444;">
-            <h3 style="color: #ef4444; margin-top: 0;">❌ No se encontraron resultados</h3>
-            <p>Lo siento, no encontré información relevante para tu consulta en los documentos disponibles.</p>
-
-            <p><strong>💡 Sugerencias:</strong></p>
-            <ul>
-                <li>Reformula tu pregunta con otros términos</li>
-                <li>Sé más específico sobre el trámite que buscas</li>
-                <li>Escribe <strong>"ayuda"</strong> para ver los temas disponibles</li>
-            </ul>
-        </div>
-        """
+        return _NO_RESULTS_MSG
@@ -10,12 +10,14 @@ from .exceptions import (
     RAGException,
     EmbeddingGenerationError,
     VectorSearchError,
-    ChatGenerationError
+    ChatGenerationError,
+    SessionAlreadyExistsError
 )
 
 __all__ = [
     "RAGException",
     "EmbeddingGenerationError",
     "VectorSearchError",
-    "ChatGenerationError"
+    "ChatGenerationError",
+    "SessionAlreadyExistsError"
 ]
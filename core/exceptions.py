@@ -32,3 +32,9 @@ class VectorStoreError(RAGException):
     """Exception raised when vector store operations fail"""
     def __init__(self, message: str = "Vector store operation failed"):
         super().__init__(message)
+
+
+class SessionAlreadyExistsError(RAGException):
+    """Exception raised when creating a chat session whose session_id is already taken"""
+    def __init__(self, message: str = "Chat session already exists"):
+        super().__init__(message)
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Literal, Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     """
     Representa un mensaje individual en una conversación.
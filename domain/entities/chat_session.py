@@ -1,36 +1,58 @@
 """
 Entidad ChatSession - Sesión de conversación
 """
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import Deque, List, Optional, Dict, Any
 from .chat_message import ChatMessage
 
+# Máximo de mensajes retenidos por sesión (los más antiguos se descartan)
+MAX_SESSION_MESSAGES = 200
 
-@dataclass
+# Etiquetas de rol usadas al formatear el historial para el LLM
+ROLE_LABELS = {
+    'user': 'Usuario',
+    'assistant': 'Asistente',
+    'system': 'Sistema'
+}
+
+
+@dataclass(slots=True)
 class ChatSession:
     """
     Representa una sesión de conversación con historial de mensajes.
 
     Attributes:
         session_id: Identificador único de la sesión
-        messages: Lista de mensajes en la conversación
+        messages: Mensajes de la conversación (como máximo MAX_SESSION_MESSAGES)
         created_at: Timestamp de creación
         updated_at: Timestamp de última actualización
         user_id: ID del usuario (opcional)
         metadata: Información adicional de la sesión
+        total_messages: Mensajes guardados en el almacén, cuando se cuentan
+            sin cargarlos (None: se cuentan los de messages)
+        last_message: Último mensaje guardado, cuando se obtiene sin cargar
+            el historial (None: se usa el último de messages)
     """
     session_id: str
-    messages: List[ChatMessage] = field(default_factory=list)
+    messages: Deque[ChatMessage] = field(
+        default_factory=lambda: deque(maxlen=MAX_SESSION_MESSAGES)
+    )
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     user_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    total_messages: Optional[int] = None
+    last_message: Optional[ChatMessage] = None
 
     def __post_init__(self):
         """Validación post-inicialización"""
         if not self.session_id or not self.session_id.strip():
             raise ValueError("session_id no puede estar vacío")
+        if not isinstance(self.messages, deque) or self.messages.maxlen != MAX_SESSION_MESSAGES:
+            self.messages = deque(self.messages, maxlen=MAX_SESSION_MESSAGES)
 
     def add_message(self, message: ChatMessage) -> None:
         """
@@ -40,12 +62,22 @@ class ChatSession:
             message: Mensaje a agregar
         """
         self.messages.append(message)
+        if self.total_messages is not None:
+            self.total_messages += 1
         self.updated_at = datetime.now()
 
     def get_message_count(self) -> int:
         """Retorna el número total de mensajes"""
+        if self.total_messages is not None:
+            return self.total_messages
         return len(self.messages)
 
+    def get_last_message(self) -> Optional[ChatMessage]:
+        """Retorna el mensaje más reciente (None si no hay mensajes)"""
+        if self.messages:
+            return self.messages[-1]
+        return self.last_message
+
     def get_user_messages(self) -> List[ChatMessage]:
         """Retorna solo los mensajes del usuario"""
         return [msg for msg in self.messages if msg.is_user_message()]
@@ -64,7 +96,13 @@ class ChatSession:
         Returns:
             Lista de mensajes más recientes
         """
-        return self.messages[-limit:] if limit > 0 else self.messages
+        if limit <= 0 or limit >= len(self.messages):
+            return list(self.messages)
+
+        # Recorrer desde el final: O(limit) en lugar de O(len(messages))
+        recent = list(islice(reversed(self.messages), limit))
+        recent.reverse()
+        return recent
 
     def get_conversation_context(self, max_messages: int = 10) -> str:
         """
@@ -77,26 +115,18 @@ class ChatSession:
         Returns:
             String formateado con el historial
         """
-        recent_messages = self.get_recent_messages(max_messages)
-
-        if not recent_messages:
-            return ""
-
-        context_parts = []
-        for msg in recent_messages:
-            role_label = {
-                'user': 'Usuario',
-                'assistant': 'Asistente',
-                'system': 'Sistema'
-            }.get(msg.role, msg.role)
-
-            context_parts.append(f"{role_label}: {msg.content}")
-
-        return "\n\n".join(context_parts)
+        label = ROLE_LABELS.get
+        return "\n\n".join(
+            f"{label(msg.role, msg.role)}: {msg.content}"
+            for msg in self.get_recent_messages(max_messages)
+        )
 
     def clear_history(self) -> None:
         """Limpia el historial de mensajes"""
         self.messages.clear()
+        self.last_message = None
+        if self.total_messages is not None:
+            self.total_messages = 0
         self.updated_at = datetime.now()
 
     def has_messages(self) -> bool:
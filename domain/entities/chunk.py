@@ -2,24 +2,31 @@
 DocumentChunk Entity - Representa un fragmento de documento con embedding
 """
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class DocumentChunk:
     """
     Entidad de dominio: Chunk de Documento
 
     Representa un fragmento de texto de un documento con su vector embedding.
+    El embedding se guarda como un array float32 contiguo (no como lista de floats).
     """
     id: str
     document_id: str
     text: str
     page_number: int
     chunk_index: int
-    embedding: List[float]
+    embedding: np.ndarray
     metadata: Optional[dict] = None
 
+    def __post_init__(self):
+        """Convierte el embedding recibido (lista o array) a float32"""
+        self.embedding = np.asarray(self.embedding, dtype=np.float32)
+
     @property
     def embedding_dimension(self) -> int:
         """
@@ -28,7 +35,7 @@ class DocumentChunk:
         Returns:
             int: Número de dimensiones (debería ser 768 para Gemini)
         """
-        return len(self.embedding)
+        return self.embedding.shape[0]
 
     def validate_embedding_dimension(self, expected_dim: int = 768) -> bool:
         """
@@ -5,8 +5,12 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+# Tipos de documento con lógica de negocio propia
+_LEGAL_TYPES = frozenset({"ley", "ordenanza", "decreto", "reglamento"})
+_SINGLE_CHUNK_TYPES = frozenset({"formulario", "guia", "documento_general"})
 
-@dataclass
+
+@dataclass(slots=True)
 class Document:
     """
     Entidad de dominio: Documento Municipal
@@ -31,8 +35,7 @@ class Document:
         Returns:
             bool: True si es ley, ordenanza, decreto o reglamento
         """
-        legal_types = {"ley", "ordenanza", "decreto", "reglamento"}
-        return self.document_type in legal_types
+        return self.document_type in _LEGAL_TYPES
 
     def is_small_document(self) -> bool:
         """
@@ -59,5 +62,4 @@ class Document:
         Returns:
             bool: True si es documento pequeño de tipo formulario/guía/general
         """
-        small_doc_types = {"formulario", "guia", "documento_general"}
-        return self.is_small_document() and self.document_type in small_doc_types
+        return self.is_small_document() and self.document_type in _SINGLE_CHUNK_TYPES
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Feedback:
     """
     Representa la retroalimentación del usuario sobre una respuesta del RAG.
@@ -55,8 +55,9 @@ class Feedback:
         if self.created_at is None:
             self.created_at = datetime.now()
 
+        # Un feedback recién creado no ha sido modificado: comparte el timestamp
         if self.updated_at is None:
-            self.updated_at = datetime.now()
+            self.updated_at = self.created_at
 
     def mark_as_correct(self) -> None:
         """Marca la respuesta como correcta"""
@@ -134,7 +135,7 @@ class Feedback:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ExactitudMetrics:
     """
     Métricas de exactitud del sistema RAG.
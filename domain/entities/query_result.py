@@ -4,8 +4,10 @@ QueryResult Entity - Representa el resultado de una búsqueda RAG
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class SimilarChunk:
     """Chunk encontrado en búsqueda de similitud"""
     text: str
@@ -14,9 +16,10 @@ class SimilarChunk:
     page_number: int
     similarity_score: float
     metadata: Optional[Dict] = None
+    chunk_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryResult:
     """
     Entidad de dominio: Resultado de Query RAG
@@ -44,9 +47,9 @@ class QueryResult:
         Obtiene lista de documentos únicos citados
 
         Returns:
-            List[str]: Nombres únicos de documentos
+            List[str]: Nombres únicos de documentos (en orden de aparición)
         """
-        return list(set(self.sources))
+        return list(dict.fromkeys(self.sources))
 
     def get_average_similarity(self) -> float:
         """
@@ -58,5 +61,9 @@ class QueryResult:
         if not self.similar_chunks:
             return 0.0
 
-        total_similarity = sum(chunk.similarity_score for chunk in self.similar_chunks)
-        return total_similarity / len(self.similar_chunks)
+        scores = np.fromiter(
+            (chunk.similarity_score for chunk in self.similar_chunks),
+            dtype=np.float64,
+            count=len(self.similar_chunks)
+        )
+        return float(scores.mean())
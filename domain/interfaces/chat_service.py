@@ -5,6 +5,7 @@ Contrato abstracto para servicios de generación de respuestas con LLM.
 Las implementaciones concretas estarán en infrastructure/
 """
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class IChatService(ABC):
@@ -38,6 +39,34 @@ class IChatService(ABC):
         """
         pass
 
+    async def stream_answer(
+        self,
+        query: str,
+        context: str,
+        system_prompt: str = "",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Genera una respuesta usando el LLM, emitiéndola por fragmentos
+
+        La implementación por defecto emite la respuesta completa de
+        generate_answer en un único fragmento; los servicios con soporte
+        de streaming deben sobrescribirla.
+
+        Args:
+            query: Pregunta del usuario
+            context: Contexto recuperado (chunks relevantes)
+            system_prompt: Instrucciones del sistema (opcional)
+            **kwargs: Parámetros adicionales de generate_answer
+
+        Yields:
+            str: Fragmentos de la respuesta (HTML formateado)
+
+        Raises:
+            ChatGenerationError: Si falla la generación
+        """
+        yield await self.generate_answer(query, context, system_prompt, **kwargs)
+
     @abstractmethod
     async def generate_text(self, prompt: str) -> str:
         """
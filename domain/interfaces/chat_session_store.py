@@ -2,7 +2,8 @@
 Interfaz para el repositorio de sesiones de chat
 """
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 from domain.entities.chat_session import ChatSession
 from domain.entities.chat_message import ChatMessage
 
@@ -34,6 +35,7 @@ class IChatSessionStore(ABC):
             ChatSession creada
 
         Raises:
+            SessionAlreadyExistsError: Si ya existe una sesión con ese ID
             VectorStoreError: Si hay error al crear la sesión
         """
         pass
@@ -54,6 +56,25 @@ class IChatSessionStore(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_session_summary(self, session_id: str) -> Optional[ChatSession]:
+        """
+        Obtiene una sesión sin cargar su historial
+
+        Para quien solo necesita los datos de la sesión: los mensajes se
+        cuentan (total_messages) sin traerlos.
+
+        Args:
+            session_id: Identificador de la sesión
+
+        Returns:
+            ChatSession sin mensajes, con total_messages, o None si no existe
+
+        Raises:
+            VectorStoreError: Si hay error al obtener la sesión
+        """
+        pass
+
     @abstractmethod
     async def session_exists(self, session_id: str) -> bool:
         """
@@ -88,6 +109,31 @@ class IChatSessionStore(ABC):
         """
         pass
 
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[ChatMessage]
+    ) -> None:
+        """
+        Agrega varios mensajes a una sesión existente, en orden
+
+        La implementación por defecto llama a add_message por cada mensaje;
+        los almacenes que soporten inserciones en lote deben sobrescribirla
+        para hacer una sola escritura. En ese caso guardan el created_at de
+        cada mensaje (en una sola transacción, now() sería el mismo para
+        todos y su orden quedaría indefinido): el llamador debe asignarles
+        instantes distintos y crecientes.
+
+        Args:
+            session_id: ID de la sesión
+            messages: Mensajes a agregar
+
+        Raises:
+            VectorStoreError: Si hay error al agregar los mensajes
+        """
+        for message in messages:
+            await self.add_message(session_id, message)
+
     @abstractmethod
     async def get_messages(
         self,
@@ -109,6 +155,32 @@ class IChatSessionStore(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None
+    ) -> List[ChatMessage]:
+        """
+        Obtiene una página del historial, de los mensajes más recientes hacia atrás
+
+        Paginación por cursor (keyset) sobre created_at: con before se
+        obtienen solo los mensajes anteriores a ese instante.
+
+        Args:
+            session_id: ID de la sesión
+            limit: Número máximo de mensajes a retornar
+            before: Solo mensajes con created_at anterior (opcional)
+
+        Returns:
+            Lista de mensajes (más recientes primero)
+
+        Raises:
+            VectorStoreError: Si hay error al obtener mensajes
+        """
+        pass
+
     @abstractmethod
     async def delete_session(self, session_id: str) -> bool:
         """
@@ -145,17 +217,24 @@ class IChatSessionStore(ABC):
     async def get_all_sessions(
         self,
         user_id: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
     ) -> List[ChatSession]:
         """
         Obtiene todas las sesiones (opcionalmente filtradas por usuario)
 
+        Paginación por cursor (keyset): con before=(updated_at, session_id)
+        de la última sesión recibida se obtiene la página siguiente, sin
+        que la base de datos tenga que recorrer las páginas anteriores.
+
         Args:
             user_id: Filtrar por ID de usuario (opcional)
             limit: Número máximo de sesiones a retornar
+            before: (updated_at, session_id) de la última sesión de la página anterior
 
         Returns:
-            Lista de sesiones (más recientes primero)
+            Lista de sesiones (más recientes primero; a igual updated_at,
+            por session_id descendente)
 
         Raises:
             VectorStoreError: Si hay error al obtener sesiones
@@ -4,6 +4,7 @@ Interface: Embedding Service
 Contrato abstracto para servicios de generación de embeddings.
 Las implementaciones concretas estarán en infrastructure/
 """
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -32,6 +33,26 @@ class IEmbeddingService(ABC):
         """
         pass
 
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Genera embeddings para varias consultas de búsqueda
+
+        Las implementaciones con API de lotes deberían sobrescribirlo para
+        resolver todas las consultas en una sola llamada.
+
+        Args:
+            queries: Textos de las consultas
+
+        Returns:
+            List[List[float]]: Un vector embedding por consulta, en el mismo orden
+
+        Raises:
+            EmbeddingGenerationError: Si falla la generación
+        """
+        return list(await asyncio.gather(
+            *(self.generate_query_embedding(query) for query in queries)
+        ))
+
     @abstractmethod
     async def generate_document_embedding(self, text: str) -> List[float]:
         """
@@ -52,14 +73,14 @@ class IEmbeddingService(ABC):
     async def generate_batch_embeddings(
         self,
         texts: List[str],
-        delay_ms: int = 100
+        concurrency: int = 8
     ) -> List[List[float]]:
         """
-        Genera embeddings para múltiples textos (con rate limiting)
+        Genera embeddings para múltiples textos (con concurrencia acotada)
 
         Args:
             texts: Lista de textos a embeddear
-            delay_ms: Delay entre requests (para evitar rate limits)
+            concurrency: Máximo de requests simultáneos (para respetar rate limits)
 
         Returns:
             List[List[float]]: Lista de vectores embedding
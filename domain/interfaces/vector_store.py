@@ -6,6 +6,7 @@ Las implementaciones concretas estarán en infrastructure/
 """
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
+from domain.entities.query_result import SimilarChunk
 
 
 class IVectorStore(ABC):
@@ -22,23 +23,21 @@ class IVectorStore(ABC):
         embedding: List[float],
         threshold: float,
         limit: int
-    ) -> List[Dict]:
+    ) -> List[SimilarChunk]:
         """
         Busca chunks similares usando búsqueda vectorial
 
+        El filtrado por umbral, el orden y el límite se resuelven en el
+        motor vectorial: el resultado ya viene ordenado por similitud
+        descendente y los llamadores no vuelven a puntuar los chunks.
+
         Args:
             embedding: Vector de búsqueda
             threshold: Umbral mínimo de similitud (0-1)
             limit: Número máximo de resultados
 
         Returns:
-            List[Dict]: Lista de chunks con metadata
-                Cada dict contiene:
-                - text: Texto del chunk
-                - document_name: Nombre del documento
-                - document_id: ID del documento
-                - page_number: Número de página
-                - similarity: Score de similitud
+            List[SimilarChunk]: Chunks encontrados con su score de similitud
 
         Raises:
             VectorSearchError: Si falla la búsqueda
@@ -2,5 +2,12 @@
 
 from .gemini_embedding_service import GeminiEmbeddingService
 from .gemini_chat_service import GeminiChatService
+from .batching_embedding_service import BatchingEmbeddingService
+from .caching_embedding_service import CachingEmbeddingService
 
-__all__ = ["GeminiEmbeddingService", "GeminiChatService"]
+__all__ = [
+    "GeminiEmbeddingService",
+    "GeminiChatService",
+    "BatchingEmbeddingService",
+    "CachingEmbeddingService",
+]
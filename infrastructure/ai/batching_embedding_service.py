@@ -0,0 +1,129 @@
+"""
+Batching Embedding Service - Agrupa embeddings de consultas concurrentes
+"""
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+from domain.interfaces.embedding_service import IEmbeddingService
+from core.exceptions import EmbeddingGenerationError
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbeddingService(IEmbeddingService):
+    """
+    Decorador de IEmbeddingService que agrupa consultas concurrentes
+
+    Las consultas que llegan dentro de una ventana corta (max_wait_ms) se
+    resuelven con una sola llamada a generate_query_embeddings del servicio
+    envuelto, hasta max_batch consultas por llamada. Los embeddings de
+    documentos se delegan sin cambios.
+    """
+
+    def __init__(
+        self,
+        inner: IEmbeddingService,
+        max_batch: int = 32,
+        max_wait_ms: int = 10
+    ):
+        """
+        Args:
+            inner: Servicio de embeddings real
+            max_batch: Número máximo de consultas por llamada
+            max_wait_ms: Tiempo máximo de espera para completar un lote
+        """
+        self._inner = inner
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def generate_query_embedding(self, query: str) -> List[float]:
+        """
+        Encola la consulta y espera su embedding
+
+        Args:
+            query: Texto de la consulta del usuario
+
+        Returns:
+            List[float]: Vector embedding
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((query, future))
+        return await future
+
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Delegado directo: la llamada ya es un lote"""
+        return await self._inner.generate_query_embeddings(queries)
+
+    async def generate_document_embedding(self, text: str) -> List[float]:
+        """Delegado directo al servicio envuelto"""
+        return await self._inner.generate_document_embedding(text)
+
+    async def generate_batch_embeddings(
+        self,
+        texts: List[str],
+        concurrency: int = 8
+    ) -> List[List[float]]:
+        """Delegado directo al servicio envuelto"""
+        return await self._inner.generate_batch_embeddings(texts, concurrency)
+
+    def _ensure_worker(self) -> None:
+        """Arranca el worker de lotes en el event loop actual si no existe"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect_batches())
+
+    async def _collect_batches(self) -> None:
+        """Agrupa consultas pendientes y despacha un lote por ventana"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self._max_wait
+
+            while len(batch) < self._max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # El lote se resuelve en otra tarea para seguir agrupando mientras tanto
+            task = self._loop.create_task(self._flush(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Resuelve un lote de consultas con una sola llamada"""
+        pending = [(query, future) for query, future in batch if not future.done()]
+        if not pending:
+            return
+
+        try:
+            embeddings = await self._inner.generate_query_embeddings(
+                [query for query, _ in pending]
+            )
+            # Sin un embedding por consulta no se puede emparejar ninguno:
+            # falla el lote completo en vez de dejar futures sin resolver
+            if len(embeddings) != len(pending):
+                raise EmbeddingGenerationError(
+                    f"Expected {len(pending)} query embeddings, got {len(embeddings)}"
+                )
+        except Exception as e:
+            logger.error(f"Error generating batched query embeddings: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Resolved {len(pending)} query embeddings in one batch")
+        for (_, future), embedding in zip(pending, embeddings):
+            if not future.done():
+                future.set_result(embedding)
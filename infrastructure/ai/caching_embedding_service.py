@@ -0,0 +1,186 @@
+"""
+Caching Embedding Service - Cache LRU en memoria de embeddings
+"""
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+
+from domain.interfaces.embedding_service import IEmbeddingService
+
+logger = logging.getLogger(__name__)
+
+# Puntuación que no está entre dos dígitos ("25.50" y "1,200" se conservan)
+_PUNCTUATION = re.compile(r"(?<!\d)[^\w\s]|[^\w\s](?!\d)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CachingEmbeddingService(IEmbeddingService):
+    """
+    Decorador de IEmbeddingService con cache LRU por texto
+
+    Consultas y documentos se cachean por separado (el task_type del
+    embedding es distinto). Los vectores se guardan como arrays float32
+    para no retener miles de listas de floats de Python, y las claves son
+    el SHA-256 del texto para no retener el texto completo de cada chunk.
+
+    Las consultas se indexan sin distinguir mayúsculas ni espacios
+    repetidos ("¿Cómo saco mi DNI?" y "¿cómo saco mi dni? " comparten
+    embedding). Los documentos, por su texto normalizado (minúsculas, sin
+    puntuación ni espacios repetidos): al re-indexar un chunk con un
+    cambio trivial se reutiliza el embedding en vez de pedirlo de nuevo.
+    """
+
+    def __init__(self, inner: IEmbeddingService, max_entries: int = 10000):
+        """
+        Args:
+            inner: Servicio de embeddings real
+            max_entries: Máximo de embeddings cacheados por tipo (consulta/documento)
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser mayor que 0")
+
+        self._inner = inner
+        self._max_entries = max_entries
+        self._query_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._document_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    async def generate_query_embedding(self, query: str) -> List[float]:
+        """
+        Genera (o recupera del cache) el embedding de una consulta
+
+        Args:
+            query: Texto de la consulta del usuario
+
+        Returns:
+            List[float]: Vector embedding
+        """
+        key = self._query_key(query)
+        cached = self._get(self._query_cache, key)
+        if cached is not None:
+            return cached
+
+        embedding = await self._inner.generate_query_embedding(query)
+        self._put(self._query_cache, key, embedding)
+        return embedding
+
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embeddings de varias consultas; solo se piden las que no están en cache"""
+        return await self._get_many(
+            self._query_cache,
+            queries,
+            self._query_key,
+            self._inner.generate_query_embeddings
+        )
+
+    async def generate_document_embedding(self, text: str) -> List[float]:
+        """
+        Genera (o recupera del cache) el embedding de un documento/chunk
+
+        Args:
+            text: Texto del documento a embeddear
+
+        Returns:
+            List[float]: Vector embedding
+        """
+        key = self._document_key(text)
+        cached = self._get(self._document_cache, key)
+        if cached is not None:
+            return cached
+
+        embedding = await self._inner.generate_document_embedding(text)
+        self._put(self._document_cache, key, embedding)
+        return embedding
+
+    async def generate_batch_embeddings(
+        self,
+        texts: List[str],
+        concurrency: int = 8
+    ) -> List[List[float]]:
+        """Embeddings de varios documentos; los textos repetidos o cacheados no se piden"""
+        return await self._get_many(
+            self._document_cache,
+            texts,
+            self._document_key,
+            lambda missing: self._inner.generate_batch_embeddings(missing, concurrency)
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Estadísticas del cache
+
+        Returns:
+            Dict con hits, misses y número de entradas por tipo
+        """
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "query_entries": len(self._query_cache),
+            "document_entries": len(self._document_cache)
+        }
+
+    async def _get_many(
+        self,
+        cache: "OrderedDict[bytes, np.ndarray]",
+        texts: List[str],
+        key_of: Callable[[str], bytes],
+        generate: Callable[[List[str]], Awaitable[List[List[float]]]]
+    ) -> List[List[float]]:
+        """Resuelve desde el cache y pide al servicio envuelto solo los textos que faltan"""
+        keys = [key_of(text) for text in texts]
+        results: Dict[bytes, List[float]] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in missing:
+                continue
+            cached = self._get(cache, key)
+            if cached is None:
+                missing[key] = text
+            else:
+                results[key] = cached
+
+        if missing:
+            embeddings = await generate(list(missing.values()))
+            for key, embedding in zip(missing, embeddings):
+                self._put(cache, key, embedding)
+                results[key] = embedding
+            logger.debug("Embedding cache: %d cached, %d generated", len(results) - len(missing), len(missing))
+
+        return [results[key] for key in keys]
+
+    def _get(self, cache: "OrderedDict[bytes, np.ndarray]", key: bytes) -> List[float] | None:
+        vector = cache.get(key)
+        if vector is None:
+            self._cache_misses += 1
+            return None
+
+        self._cache_hits += 1
+        cache.move_to_end(key)
+        return vector.tolist()
+
+    def _put(self, cache: "OrderedDict[bytes, np.ndarray]", key: bytes, embedding: List[float]) -> None:
+        cache[key] = np.asarray(embedding, dtype=np.float32)
+        cache.move_to_end(key)
+        if len(cache) > self._max_entries:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        """Clave de cache de un texto (digest SHA-256 de 32 bytes)"""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    @classmethod
+    def _query_key(cls, query: str) -> bytes:
+        """Clave de cache de una consulta: SHA-256 sin mayúsculas ni espacios repetidos"""
+        return cls._key(" ".join(query.casefold().split()))
+
+    @classmethod
+    def _document_key(cls, text: str) -> bytes:
+        """Clave de cache de un documento: SHA-256 de su texto normalizado"""
+        normalized = _WHITESPACE.sub(" ", _PUNCTUATION.sub("", text.casefold())).strip()
+        return cls._key(normalized)
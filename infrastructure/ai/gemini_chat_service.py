@@ -2,121 +2,21 @@
 Gemini Chat Service - Implementación con Google Gemini
 """
 import google.generativeai as genai
-import asyncio
 import logging
-from typing import List, Optional
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Tuple
 from domain.interfaces.chat_service import IChatService
 from domain.entities.chat_message import ChatMessage
+from domain.entities.chat_session import ROLE_LABELS
 from infrastructure.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Máximo de modelos por system prompt retenidos (LRU)
+_MAX_ANSWER_MODELS = 8
 
-class GeminiChatService(IChatService):
-    """
-    Implementación de IChatService usando Google Gemini
-
-    Genera respuestas usando gemini-2.0-flash-exp
-    """
-
-    def __init__(self):
-        """Initialize Gemini AI client"""
-        settings = get_settings()
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model_name = settings.GEMINI_CHAT_MODEL
-        self.model = genai.GenerativeModel(self.model_name)
-        logger.info(f"GeminiChatService initialized with model: {self.model_name}")
-
-    async def generate_answer(
-        self,
-        query: str,
-        context: str,
-        system_prompt: str = "",
-        conversation_history: Optional[List[ChatMessage]] = None
-    ) -> str:
-        """
-        Genera una respuesta usando el LLM con memoria conversacional
-
-        Args:
-            query: Pregunta del usuario
-            context: Contexto recuperado (chunks relevantes)
-            system_prompt: Instrucciones del sistema (opcional)
-            conversation_history: Historial de conversación (opcional)
-
-        Returns:
-            str: Respuesta generada (HTML formateado)
-        """
-        try:
-            # System prompt por defecto
-            if not system_prompt:
-                system_prompt = self._get_default_system_prompt()
-
-            # Construir historial de conversación si existe
-            history_text = ""
-            if conversation_history and len(conversation_history) > 0:
-                history_text = "\n\nHISTORIAL DE CONVERSACIÓN:\n"
-                for msg in conversation_history:
-                    role_label = {
-                        'user': 'Usuario',
-                        'assistant': 'Asistente',
-                        'system': 'Sistema'
-                    }.get(msg.role, msg.role)
-                    history_text += f"{role_label}: {msg.content}\n\n"
-
-            # Construir prompt completo
-            full_prompt = f"""{system_prompt}
-{history_text}
-CONTEXTO RECUPERADO:
-{context}
-
-PREGUNTA DEL USUARIO:
-{query}
-
-RESPUESTA:"""
-
-            # Generar respuesta
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content(full_prompt)
-            )
-
-            return response.text
-
-        except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            raise
-
-    async def generate_text(self, prompt: str) -> str:
-        """
-        Genera texto a partir de un prompt genérico
-
-        Args:
-            prompt: Prompt de entrada
-
-        Returns:
-            str: Texto generado
-        """
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content(prompt)
-            )
-            return response.text
-
-        except Exception as e:
-            logger.error(f"Error generating text: {e}")
-            raise
-
-    def _get_default_system_prompt(self) -> str:
-        """
-        Obtiene el prompt del sistema por defecto para RAG
-
-        Returns:
-            str: System prompt
-        """
-        return """Eres un asistente especializado en atención ciudadana para trámites municipales de Carabayllo, Perú.
+# System prompt por defecto para RAG (se envía como system_instruction)
+_DEFAULT_SYSTEM_PROMPT = """Eres un asistente especializado en atención ciudadana para trámites municipales de Carabayllo, Perú.
 
 INSTRUCCIONES IMPORTANTES:
 1. SOLO responde usando información del CONTEXTO RECUPERADO proporcionado
@@ -204,3 +104,176 @@ TEMAS QUE MANEJAS:
 - Procesos de fiscalización
 
 Si la pregunta es sobre temas NO relacionados con trámites municipales, responde cortésmente que solo puedes ayudar con trámites municipales de Carabayllo."""
+
+
+class GeminiChatService(IChatService):
+    """
+    Implementación de IChatService usando Google Gemini
+
+    Genera respuestas usando gemini-2.0-flash-exp
+    """
+
+    def __init__(self):
+        """Initialize Gemini AI client"""
+        settings = get_settings()
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model_name = settings.GEMINI_CHAT_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+        # Un modelo por system prompt: la instrucción del sistema viaja como
+        # prefijo estable separado del contenido variable de cada request.
+        # El del prompt por defecto se crea aquí, una sola vez
+        self._answer_models: "OrderedDict[str, genai.GenerativeModel]" = OrderedDict()
+        self._get_answer_model(_DEFAULT_SYSTEM_PROMPT)
+        logger.debug("GeminiChatService initialized with model: %s", self.model_name)
+
+    async def generate_answer(
+        self,
+        query: str,
+        context: str,
+        system_prompt: str = "",
+        conversation_history: Optional[List[ChatMessage]] = None
+    ) -> str:
+        """
+        Genera una respuesta usando el LLM con memoria conversacional
+
+        Args:
+            query: Pregunta del usuario
+            context: Contexto recuperado (chunks relevantes)
+            system_prompt: Instrucciones del sistema (opcional)
+            conversation_history: Historial de conversación (opcional)
+
+        Returns:
+            str: Respuesta generada (HTML formateado)
+        """
+        try:
+            model, full_prompt = self._prepare_answer(
+                query, context, system_prompt, conversation_history
+            )
+
+            # Generar respuesta
+            response = await model.generate_content_async(full_prompt)
+
+            return response.text
+
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
+            raise
+
+    async def stream_answer(
+        self,
+        query: str,
+        context: str,
+        system_prompt: str = "",
+        conversation_history: Optional[List[ChatMessage]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Genera una respuesta emitiendo los fragmentos a medida que llegan de Gemini
+
+        Args:
+            query: Pregunta del usuario
+            context: Contexto recuperado (chunks relevantes)
+            system_prompt: Instrucciones del sistema (opcional)
+            conversation_history: Historial de conversación (opcional)
+
+        Yields:
+            str: Fragmentos de la respuesta (HTML formateado)
+        """
+        try:
+            model, full_prompt = self._prepare_answer(
+                query, context, system_prompt, conversation_history
+            )
+
+            response = await model.generate_content_async(full_prompt, stream=True)
+            async for chunk in response:
+                if chunk.parts:
+                    yield chunk.text
+
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            raise
+
+    def _prepare_answer(
+        self,
+        query: str,
+        context: str,
+        system_prompt: str,
+        conversation_history: Optional[List[ChatMessage]]
+    ) -> Tuple[genai.GenerativeModel, str]:
+        """
+        Selecciona el modelo y construye el prompt de una respuesta RAG
+
+        Returns:
+            Tupla (modelo con la system_instruction, prompt completo)
+        """
+        # Construir historial de conversación si existe
+        history_text = ""
+        if conversation_history:
+            history_text = "\n\nHISTORIAL DE CONVERSACIÓN:\n" + "".join(
+                f"{ROLE_LABELS.get(msg.role, msg.role)}: {msg.content}\n\n"
+                for msg in conversation_history
+            )
+
+        # Construir prompt (el system prompt va como system_instruction)
+        full_prompt = f"""{history_text}
+CONTEXTO RECUPERADO:
+{context}
+
+PREGUNTA DEL USUARIO:
+{query}
+
+RESPUESTA:"""
+
+        model = self._get_answer_model(system_prompt or _DEFAULT_SYSTEM_PROMPT)
+        return model, full_prompt
+
+    async def generate_text(self, prompt: str) -> str:
+        """
+        Genera texto a partir de un prompt genérico
+
+        Args:
+            prompt: Prompt de entrada
+
+        Returns:
+            str: Texto generado
+        """
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return response.text
+
+        except Exception as e:
+            logger.error(f"Error generating text: {e}")
+            raise
+
+    def _get_answer_model(self, system_prompt: str) -> genai.GenerativeModel:
+        """
+        Obtiene el modelo configurado con el system prompt dado
+
+        Args:
+            system_prompt: Instrucciones del sistema
+
+        Returns:
+            GenerativeModel: Modelo reutilizable para ese system prompt
+        """
+        model = self._answer_models.get(system_prompt)
+        if model is not None:
+            self._answer_models.move_to_end(system_prompt)
+            return model
+
+        model = genai.GenerativeModel(
+            self.model_name,
+            system_instruction=system_prompt
+        )
+        self._answer_models[system_prompt] = model
+        if len(self._answer_models) > _MAX_ANSWER_MODELS:
+            self._answer_models.popitem(last=False)
+        return model
+
+    def _get_default_system_prompt(self) -> str:
+        """
+        Obtiene el prompt del sistema por defecto para RAG
+
+        Returns:
+            str: System prompt
+        """
+        return _DEFAULT_SYSTEM_PROMPT
+
@@ -2,14 +2,18 @@
 Gemini Embedding Service - Implementación con Google Gemini
 """
 import google.generativeai as genai
-from typing import List
+from typing import List, Union
 import asyncio
 import logging
 from domain.interfaces.embedding_service import IEmbeddingService
 from infrastructure.config.settings import get_settings
+from infrastructure.ai.rate_limiter import AsyncRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Máximo de textos por llamada a embed_content (límite de batchEmbedContents)
+_MAX_TEXTS_PER_CALL = 100
+
 
 class GeminiEmbeddingService(IEmbeddingService):
     """
@@ -23,6 +27,9 @@ class GeminiEmbeddingService(IEmbeddingService):
         settings = get_settings()
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model_name = settings.GEMINI_EMBEDDING_MODEL
+        self._model_path = f"models/{self.model_name}"
+        # Cuota de la API compartida por todas las llamadas del servicio
+        self._limiter = AsyncRateLimiter(settings.GEMINI_EMBEDDING_REQUESTS_PER_MINUTE)
         logger.info(f"GeminiEmbeddingService initialized with model: {self.model_name}")
 
     async def generate_query_embedding(self, query: str) -> List[float]:
@@ -36,20 +43,27 @@ class GeminiEmbeddingService(IEmbeddingService):
             List[float]: Vector embedding (768 dimensiones)
         """
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: genai.embed_content(
-                    model=f"models/{self.model_name}",
-                    content=query,
-                    task_type="retrieval_query"
-                )
-            )
-            return result['embedding']
+            return await self._embed(query, "retrieval_query")
         except Exception as e:
             logger.error(f"Error generating query embedding: {e}")
             raise
 
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Genera embeddings para varias consultas en una sola llamada a la API
+
+        Args:
+            queries: Textos de las consultas
+
+        Returns:
+            List[List[float]]: Un vector embedding por consulta, en el mismo orden
+        """
+        try:
+            return await self._embed(queries, "retrieval_query")
+        except Exception as e:
+            logger.error(f"Error generating query embeddings batch: {e}")
+            raise
+
     async def generate_document_embedding(self, text: str) -> List[float]:
         """
         Genera embedding para un documento/chunk
@@ -61,17 +75,7 @@ class GeminiEmbeddingService(IEmbeddingService):
             List[float]: Vector embedding (768 dimensiones)
         """
         try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: genai.embed_content(
-                    model=f"models/{self.model_name}",
-                    content=text,
-                    task_type="retrieval_document"
-                )
-            )
-            return result['embedding']
+            return await self._embed(text, "retrieval_document")
         except Exception as e:
             logger.error(f"Error generating document embedding: {e}")
             raise
@@ -79,36 +83,61 @@ class GeminiEmbeddingService(IEmbeddingService):
     async def generate_batch_embeddings(
         self,
         texts: List[str],
-        delay_ms: int = 100
+        concurrency: int = 8
     ) -> List[List[float]]:
         """
-        Genera embeddings para múltiples textos (con rate limiting)
+        Genera embeddings para múltiples textos (con concurrencia acotada)
+
+        Los textos se envían en lotes de hasta _MAX_TEXTS_PER_CALL por llamada
+        y como máximo `concurrency` llamadas en paralelo.
 
         Args:
             texts: Lista de textos a embeddear
-            delay_ms: Delay entre requests (para evitar rate limits)
+            concurrency: Máximo de llamadas simultáneas (para evitar rate limits)
 
         Returns:
-            List[List[float]]: Lista de vectores embedding
+            List[List[float]]: Lista de vectores embedding, en el mismo orden
         """
-        embeddings = []
-
-        for i, text in enumerate(texts):
-            try:
-                embedding = await self.generate_document_embedding(text)
-                embeddings.append(embedding)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def embed_slice(start: int) -> List[List[float]]:
+            batch = texts[start:start + _MAX_TEXTS_PER_CALL]
+            async with semaphore:
+                try:
+                    embeddings = await self._embed(batch, "retrieval_document")
+                except Exception as e:
+                    logger.error(f"Error embedding texts {start}-{start + len(batch) - 1}: {e}")
+                    raise
+            logger.info(f"Generated embeddings {start + 1}-{start + len(batch)} of {len(texts)}")
+            return embeddings
+
+        batches = await asyncio.gather(
+            *(embed_slice(start) for start in range(0, len(texts), _MAX_TEXTS_PER_CALL))
+        )
+        embeddings = [embedding for batch in batches for embedding in batch]
 
-                # Log progress
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Generated embeddings: {i + 1}/{len(texts)}")
+        logger.info(f"Successfully generated {len(embeddings)} embeddings")
+        return embeddings
 
-                # Rate limiting
-                if i < len(texts) - 1:
-                    await asyncio.sleep(delay_ms / 1000)
+    async def _embed(
+        self,
+        content: Union[str, List[str]],
+        task_type: str
+    ) -> Union[List[float], List[List[float]]]:
+        """
+        Llama a embed_content respetando el límite de peticiones por minuto
 
-            except Exception as e:
-                logger.error(f"Error embedding text {i}: {e}")
-                raise
+        Args:
+            content: Texto o lista de textos (como máximo _MAX_TEXTS_PER_CALL)
+            task_type: Tipo de tarea del embedding (retrieval_query/retrieval_document)
 
-        logger.info(f"Successfully generated {len(embeddings)} embeddings")
-        return embeddings
+        Returns:
+            Vector embedding, o lista de vectores si content es una lista
+        """
+        async with self._limiter:
+            result = await genai.embed_content_async(
+                model=self._model_path,
+                content=content,
+                task_type=task_type
+            )
+        return result['embedding']
@@ -0,0 +1,53 @@
+"""
+Rate Limiter - Limita la tasa de llamadas a APIs externas
+"""
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Limitador de tasa tipo leaky bucket para corrutinas
+
+    Permite ráfagas de hasta max_rate llamadas y, a partir de ahí,
+    espacia las siguientes para no superar max_rate por time_period.
+    Se usa como context manager asíncrono:
+
+        async with limiter:
+            await llamada_a_la_api()
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        """
+        Args:
+            max_rate: Máximo de llamadas permitidas por periodo
+            time_period: Duración del periodo en segundos
+        """
+        if max_rate <= 0 or time_period <= 0:
+            raise ValueError("max_rate y time_period deben ser mayores que 0")
+
+        self._capacity = max_rate
+        self._rate_per_sec = max_rate / time_period
+        self._level = 0.0
+        self._last_check = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Reserva un hueco en el bucket, esperando si está lleno"""
+        now = time.monotonic()
+        drained = (now - self._last_check) * self._rate_per_sec
+        self._level = max(0.0, self._level - drained)
+        self._last_check = now
+
+        # La reserva se hace antes de esperar: las llamadas concurrentes
+        # se encolan detrás sin necesidad de un lock
+        self._level += 1
+        excess = self._level - self._capacity
+        if excess > 0:
+            await asyncio.sleep(excess / self._rate_per_sec)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
@@ -1,8 +1,9 @@
 """
 Application configuration using Pydantic Settings
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -26,11 +27,27 @@ class Settings(BaseSettings):
     # Supabase
     SUPABASE_URL: str
     SUPABASE_KEY: str
+    # Tiempo máximo de una petición a PostgREST (el cliente usa 120 s por defecto)
+    SUPABASE_HTTP_TIMEOUT_SECONDS: float = 30
+    # Conexión directa a PostgreSQL para las sesiones de chat (opcional;
+    # sin ella las sesiones van por PostgREST)
+    SUPABASE_DB_DSN: Optional[str] = None
+    # Por proceso: con varios workers, el total debe caber en el límite de
+    # conexiones del plan de Supabase
+    SUPABASE_DB_POOL_MIN_SIZE: int = 3
+    SUPABASE_DB_POOL_MAX_SIZE: int = 5
+    SUPABASE_DB_POOL_MAX_IDLE_SECONDS: float = 1800
+    # 0 con el pooler de Supavisor en modo transacción (no conserva sentencias preparadas)
+    SUPABASE_DB_STATEMENT_CACHE_SIZE: int = 100
 
     # Google Gemini AI
     GEMINI_API_KEY: str
     GEMINI_EMBEDDING_MODEL: str = "text-embedding-004"
     GEMINI_CHAT_MODEL: str = "gemini-2.0-flash-exp"
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 10
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000
+    GEMINI_EMBEDDING_REQUESTS_PER_MINUTE: int = 1500
 
     # RAG Configuration
     RAG_CHUNK_SIZE: int = 1000
@@ -38,13 +55,30 @@ class Settings(BaseSettings):
     RAG_SIMILARITY_THRESHOLD: float = 0.4
     RAG_TOP_K_RESULTS: int = 5
 
+    # RAG Response Cache
+    RAG_CACHE_MAX_ENTRIES: int = 256
+    RAG_CACHE_SIMILARITY_THRESHOLD: float = 0.97
+    RAG_CACHE_TTL_SECONDS: float = 3600
+    RAG_CONTEXT_CACHE_MAX_ENTRIES: int = 128
+
+    # Statistics Cache
+    STATS_CACHE_TTL_SECONDS: float = 60
+
+    # Chat Session Cache
+    SESSION_CACHE_MAX_ENTRIES: int = 1024
+    SESSION_CACHE_TTL_SECONDS: float = 30
+
     # PDF Processing
     PDF_STORAGE_BUCKET: str = "documentos_municipales"
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
+    # frozen: la instancia única de get_settings() se comparte entre
+    # requests y servicios, así que no debe poder modificarse
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        frozen=True
+    )
 
 
 @lru_cache()
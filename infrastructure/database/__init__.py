@@ -3,9 +3,13 @@
 from .supabase_vector_store import SupabaseVectorStore
 from .supabase_chat_session_store import SupabaseChatSessionStore
 from .supabase_feedback_repository import SupabaseFeedbackRepository
+# PostgresChatSessionStore no se re-exporta: requiere asyncpg y solo se
+# usa con SUPABASE_DB_DSN; se importa desde su módulo cuando hace falta
+from .caching_chat_session_store import CachingChatSessionStore
 
 __all__ = [
     "SupabaseVectorStore",
     "SupabaseChatSessionStore",
-    "SupabaseFeedbackRepository"
+    "SupabaseFeedbackRepository",
+    "CachingChatSessionStore"
 ]
@@ -0,0 +1,195 @@
+"""
+Caching Chat Session Store - Cache TTL en memoria de sesiones de chat
+"""
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from domain.interfaces.chat_session_store import IChatSessionStore
+from domain.entities.chat_session import ChatSession
+from domain.entities.chat_message import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+class CachingChatSessionStore(IChatSessionStore):
+    """
+    Decorador de IChatSessionStore con cache LRU/TTL de get_session_summary
+    y get_all_sessions
+
+    Las interfaces de chat vuelven a pedir los datos de la misma sesión (y
+    el mismo listado) varias veces en pocos segundos; esas lecturas se
+    sirven desde memoria. Cualquier escritura sobre una sesión (mensajes, borrado,
+    limpieza) la invalida junto con todos los listados, porque cambia su
+    updated_at y con él el orden. El TTL acota lo desactualizada que puede
+    estar una entrada si la modifica otro proceso.
+    """
+
+    def __init__(
+        self,
+        inner: IChatSessionStore,
+        max_entries: int = 1024,
+        ttl_seconds: float = 30.0
+    ):
+        """
+        Args:
+            inner: Almacén de sesiones real
+            max_entries: Máximo de sesiones cacheadas
+            ttl_seconds: Segundos que una sesión cacheada se considera válida
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser mayor que 0")
+
+        self._inner = inner
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._summaries: "OrderedDict[str, Tuple[float, ChatSession]]" = OrderedDict()
+        self._listings: "OrderedDict[tuple, Tuple[float, List[ChatSession]]]" = OrderedDict()
+        # Se incrementa en cada invalidación: una lectura que empezó antes
+        # de una escritura no debe guardar su resultado (ya obsoleto)
+        self._generation = 0
+
+    async def create_session(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> ChatSession:
+        """Crea una nueva sesión de chat"""
+        with self._writing(session_id):
+            return await self._inner.create_session(session_id, user_id, metadata)
+
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+        """Obtiene una sesión con su historial (sin cache)"""
+        return await self._inner.get_session(session_id)
+
+    async def get_session_summary(self, session_id: str) -> Optional[ChatSession]:
+        """Obtiene una sesión sin su historial (desde el cache si está vigente)"""
+        cached = self._lookup(self._summaries, session_id)
+        if cached is not None:
+            logger.debug("Session summary cache hit: %s", session_id)
+            return self._copy(cached)
+
+        generation = self._generation
+        session = await self._inner.get_session_summary(session_id)
+        if session is not None:
+            self._remember(self._summaries, session_id, self._copy(session), generation)
+        return session
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Verifica si una sesión existe (sin consultar si está cacheada)"""
+        if self._lookup(self._summaries, session_id) is not None:
+            return True
+        return await self._inner.session_exists(session_id)
+
+    async def add_message(self, session_id: str, message: ChatMessage) -> None:
+        """Agrega un mensaje a una sesión existente"""
+        with self._writing(session_id):
+            await self._inner.add_message(session_id, message)
+
+    async def add_messages(self, session_id: str, messages: List[ChatMessage]) -> None:
+        """Agrega varios mensajes a una sesión existente"""
+        with self._writing(session_id):
+            await self._inner.add_messages(session_id, messages)
+
+    async def get_messages(self, session_id: str, limit: int = 10) -> List[ChatMessage]:
+        """Obtiene los mensajes de una sesión"""
+        return await self._inner.get_messages(session_id, limit)
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None
+    ) -> List[ChatMessage]:
+        """Obtiene una página del historial (sin cache)"""
+        return await self._inner.get_messages_page(session_id, limit, before)
+
+    async def delete_session(self, session_id: str) -> bool:
+        """Elimina una sesión y todos sus mensajes"""
+        with self._writing(session_id):
+            return await self._inner.delete_session(session_id)
+
+    async def clear_session_history(self, session_id: str) -> bool:
+        """Limpia el historial de mensajes de una sesión"""
+        with self._writing(session_id):
+            return await self._inner.clear_session_history(session_id)
+
+    async def get_all_sessions(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[ChatSession]:
+        """Obtiene una página de sesiones (desde el cache si está vigente)"""
+        key = (user_id, limit, before)
+        cached = self._lookup(self._listings, key)
+        if cached is not None:
+            logger.debug("Session listing cache hit: %s", key)
+            return [self._copy(session) for session in cached]
+
+        generation = self._generation
+        sessions = await self._inner.get_all_sessions(user_id, limit, before)
+        self._remember(self._listings, key, [self._copy(session) for session in sessions], generation)
+        return sessions
+
+    def clear(self) -> None:
+        """Vacía el cache"""
+        self._generation += 1
+        self._summaries.clear()
+        self._listings.clear()
+
+    @staticmethod
+    def _lookup(cache: OrderedDict, key):
+        """Valor cacheado y vigente de key (None si no está o expiró)"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return value
+
+    def _remember(self, cache: OrderedDict, key, value, generation: int) -> None:
+        """Cachea value salvo que una escritura haya invalidado el cache desde generation"""
+        if generation != self._generation:
+            return
+        cache[key] = (time.monotonic() + self._ttl, value)
+        cache.move_to_end(key)
+        if len(cache) > self._max_entries:
+            cache.popitem(last=False)
+
+    @contextmanager
+    def _writing(self, session_id: str) -> Iterator[None]:
+        """
+        Invalida la sesión antes y después de una escritura
+
+        La segunda invalidación descarta también las lecturas que empezaron
+        mientras la escritura estaba en curso: pudieron leer el estado
+        anterior y, sin ella, lo cachearían durante todo el TTL.
+        """
+        self._invalidate(session_id)
+        try:
+            yield
+        finally:
+            self._invalidate(session_id)
+
+    def _invalidate(self, session_id: str) -> None:
+        self._generation += 1
+        self._summaries.pop(session_id, None)
+        self._listings.clear()
+
+    @staticmethod
+    def _copy(session: ChatSession) -> ChatSession:
+        """Copia la sesión para que el llamador no pueda alterar la cacheada"""
+        return replace(
+            session,
+            messages=list(session.messages),
+            metadata=dict(session.metadata) if session.metadata is not None else None
+        )
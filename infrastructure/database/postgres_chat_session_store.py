@@ -0,0 +1,464 @@
+"""
+Implementación de IChatSessionStore con conexión directa a PostgreSQL (asyncpg)
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, List, Tuple
+
+import asyncpg
+import orjson
+
+from domain.interfaces.chat_session_store import IChatSessionStore
+from domain.entities.chat_session import ChatSession
+from domain.entities.chat_message import ChatMessage
+from core.exceptions import SessionAlreadyExistsError, VectorStoreError
+
+logger = logging.getLogger(__name__)
+
+_SESSION_COLUMNS = "session_id, user_id, created_at, updated_at, metadata"
+_MESSAGE_COLUMNS = "role, content, created_at, metadata"
+# Listado: sesión (alias s) más el último mensaje (alias m, columnas last_*)
+_LISTING_COLUMNS = (
+    "s.session_id, s.user_id, s.created_at, s.updated_at, s.metadata, "
+    "m.role AS last_role, m.content AS last_content, "
+    "m.created_at AS last_created_at, m.metadata AS last_metadata"
+)
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Codifica/decodifica jsonb como objetos de Python en cada conexión del pool"""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog"
+    )
+
+
+class PostgresChatSessionStore(IChatSessionStore):
+    """
+    Implementación de IChatSessionStore sobre el PostgreSQL de Supabase.
+
+    Usa las mismas tablas que SupabaseChatSessionStore ('chat_sessions' y
+    'chat_messages'), pero habla el protocolo binario de PostgreSQL a través
+    de un pool de asyncpg en lugar de HTTP+JSON contra PostgREST. asyncpg
+    prepara y cachea cada consulta por conexión, así que las del chat
+    (siempre las mismas) reutilizan su plan.
+
+    Con la conexión directa o el pooler en modo sesión se mantiene el cache
+    de sentencias; con el pooler en modo transacción (que no conserva las
+    sentencias preparadas) hay que desactivarlo con statement_cache_size=0.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 3,
+        max_size: int = 5,
+        max_idle_seconds: float = 1800,
+        statement_cache_size: int = 100
+    ):
+        """
+        Args:
+            dsn: Cadena de conexión a PostgreSQL
+            min_size: Conexiones que el pool mantiene abiertas
+            max_size: Máximo de conexiones del pool
+            max_idle_seconds: Segundos sin uso tras los que el pool cierra una conexión
+            statement_cache_size: Sentencias preparadas cacheadas por conexión (0 las desactiva)
+        """
+        self._dsn = dsn
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle_seconds = max_idle_seconds
+        self._statement_cache_size = statement_cache_size
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """Abre el pool de conexiones (idempotente)"""
+        await self._get_pool()
+
+    async def close(self) -> None:
+        """Cierra el pool de conexiones"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def create_session(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> ChatSession:
+        """Crea una nueva sesión de chat"""
+        try:
+            logger.info(f"Creating new chat session: {session_id}")
+
+            # Sin comprobación previa: ON CONFLICT decide de forma atómica si
+            # la sesión ya existía (en ese caso no se devuelve ninguna fila)
+            pool = await self._get_pool()
+            row = await pool.fetchrow(
+                "INSERT INTO chat_sessions (session_id, user_id, metadata) "
+                "VALUES ($1, $2, $3) ON CONFLICT (session_id) DO NOTHING "
+                f"RETURNING {_SESSION_COLUMNS}",
+                session_id, user_id, metadata or {}
+            )
+            if row is None:
+                raise SessionAlreadyExistsError(f"Session {session_id} already exists")
+
+            return self._to_chat_session(row)
+
+        except SessionAlreadyExistsError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error creating session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al crear sesión: {str(e)}")
+
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+        """Obtiene una sesión con su historial completo"""
+        try:
+            logger.info(f"Fetching session: {session_id}")
+
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    f"SELECT {_SESSION_COLUMNS} FROM chat_sessions WHERE session_id = $1",
+                    session_id
+                )
+                if row is None:
+                    logger.info(f"Session {session_id} not found")
+                    return None
+
+                message_rows = await conn.fetch(
+                    f"SELECT {_MESSAGE_COLUMNS} FROM chat_messages "
+                    "WHERE session_id = $1 ORDER BY created_at LIMIT $2",
+                    session_id, 100
+                )
+
+            return self._to_chat_session(
+                row,
+                [self._to_chat_message(message_row) for message_row in message_rows]
+            )
+
+        except Exception as e:
+            logger.error(f"Error fetching session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener sesión: {str(e)}")
+
+    async def get_session_summary(self, session_id: str) -> Optional[ChatSession]:
+        """Obtiene una sesión sin su historial, con el total de mensajes"""
+        try:
+            logger.info(f"Fetching session summary: {session_id}")
+
+            pool = await self._get_pool()
+            row = await pool.fetchrow(
+                f"SELECT {_SESSION_COLUMNS}, "
+                "(SELECT count(*) FROM chat_messages c WHERE c.session_id = s.session_id) AS message_count "
+                "FROM chat_sessions s WHERE session_id = $1",
+                session_id
+            )
+            if row is None:
+                logger.info(f"Session {session_id} not found")
+                return None
+
+            return self._to_chat_session(row, message_count=row["message_count"])
+
+        except Exception as e:
+            logger.error(f"Error fetching session summary {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener sesión: {str(e)}")
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Verifica si una sesión existe"""
+        try:
+            pool = await self._get_pool()
+            return await pool.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM chat_sessions WHERE session_id = $1)",
+                session_id
+            )
+
+        except Exception as e:
+            logger.error(f"Error checking session existence {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al verificar sesión: {str(e)}")
+
+    async def add_message(
+        self,
+        session_id: str,
+        message: ChatMessage
+    ) -> None:
+        """Agrega un mensaje a una sesión existente"""
+        try:
+            logger.info(f"Adding message to session {session_id} (role: {message.role})")
+
+            pool = await self._get_pool()
+            await pool.execute(
+                "INSERT INTO chat_messages (session_id, role, content, metadata) "
+                "VALUES ($1, $2, $3, $4)",
+                session_id, message.role, message.content, message.metadata or {}
+            )
+
+            logger.info(f"Message added successfully to session {session_id}")
+
+        except Exception as e:
+            logger.error(f"Error adding message to session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al agregar mensaje: {str(e)}")
+
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[ChatMessage]
+    ) -> None:
+        """Agrega varios mensajes a una sesión en un solo envío (executemany)"""
+        if not messages:
+            return
+
+        try:
+            logger.info(f"Adding {len(messages)} messages to session {session_id}")
+
+            pool = await self._get_pool()
+            # El created_at del mensaje y no el now() de la transacción, que
+            # sería el mismo para todas las filas
+            await pool.executemany(
+                "INSERT INTO chat_messages (session_id, role, content, created_at, metadata) "
+                "VALUES ($1, $2, $3, $4, $5)",
+                [
+                    (
+                        session_id,
+                        message.role,
+                        message.content,
+                        message.created_at.astimezone(),
+                        message.metadata or {}
+                    )
+                    for message in messages
+                ]
+            )
+
+            logger.info(f"Messages added successfully to session {session_id}")
+
+        except Exception as e:
+            logger.error(f"Error adding messages to session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al agregar mensajes: {str(e)}")
+
+    async def get_messages(
+        self,
+        session_id: str,
+        limit: int = 10
+    ) -> List[ChatMessage]:
+        """Obtiene los mensajes de una sesión (más antiguos primero)"""
+        try:
+            logger.info(f"Fetching messages for session {session_id} (limit: {limit})")
+
+            pool = await self._get_pool()
+            rows = await pool.fetch(
+                f"SELECT {_MESSAGE_COLUMNS} FROM chat_messages "
+                "WHERE session_id = $1 ORDER BY created_at LIMIT $2",
+                session_id, limit
+            )
+
+            messages = [self._to_chat_message(row) for row in rows]
+
+            logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
+            return messages
+
+        except Exception as e:
+            logger.error(f"Error fetching messages for session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener mensajes: {str(e)}")
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None
+    ) -> List[ChatMessage]:
+        """Obtiene una página del historial (más recientes primero)"""
+        try:
+            logger.info(f"Fetching message page for session {session_id} (limit: {limit}, before: {before})")
+
+            pool = await self._get_pool()
+            if before:
+                rows = await pool.fetch(
+                    f"SELECT {_MESSAGE_COLUMNS} FROM chat_messages "
+                    "WHERE session_id = $1 AND created_at < $2 ORDER BY created_at DESC LIMIT $3",
+                    session_id, before, limit
+                )
+            else:
+                rows = await pool.fetch(
+                    f"SELECT {_MESSAGE_COLUMNS} FROM chat_messages "
+                    "WHERE session_id = $1 ORDER BY created_at DESC LIMIT $2",
+                    session_id, limit
+                )
+
+            return [self._to_chat_message(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error fetching message page for session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener mensajes: {str(e)}")
+
+    async def delete_session(self, session_id: str) -> bool:
+        """Elimina una sesión y todos sus mensajes (CASCADE)"""
+        try:
+            logger.info(f"Deleting session: {session_id}")
+
+            pool = await self._get_pool()
+            deleted = await pool.fetchval(
+                "WITH deleted AS (DELETE FROM chat_sessions WHERE session_id = $1 RETURNING 1) "
+                "SELECT count(*) > 0 FROM deleted",
+                session_id
+            )
+
+            if deleted:
+                logger.info(f"Session {session_id} deleted successfully")
+            else:
+                logger.info(f"Session {session_id} not found for deletion")
+
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error deleting session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al eliminar sesión: {str(e)}")
+
+    async def clear_session_history(self, session_id: str) -> bool:
+        """Limpia el historial de mensajes sin eliminar la sesión"""
+        try:
+            logger.info(f"Clearing history for session: {session_id}")
+
+            # Borrado y verificación de existencia en una sola sentencia
+            pool = await self._get_pool()
+            exists = await pool.fetchval(
+                "WITH deleted AS (DELETE FROM chat_messages WHERE session_id = $1) "
+                "SELECT EXISTS (SELECT 1 FROM chat_sessions WHERE session_id = $1)",
+                session_id
+            )
+            if not exists:
+                return False
+
+            logger.info(f"History cleared for session {session_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error clearing history for session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al limpiar historial: {str(e)}")
+
+    async def get_all_sessions(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[ChatSession]:
+        """Obtiene todas las sesiones (opcionalmente filtradas por usuario y paginadas por cursor)"""
+        try:
+            logger.info(f"Fetching all sessions (user_id: {user_id}, limit: {limit}, before: {before})")
+
+            # Como mucho cuatro variantes de la sentencia, cada una preparada una vez
+            conditions = []
+            args = []
+            if user_id:
+                args.append(user_id)
+                conditions.append(f"s.user_id = ${len(args)}")
+            if before:
+                args.extend(before)
+                conditions.append(f"(s.updated_at, s.session_id) < (${len(args) - 1}, ${len(args)})")
+            args.append(limit)
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+            # Conteo de mensajes y último mensaje de cada sesión en la misma
+            # consulta, sin traer el historial
+            pool = await self._get_pool()
+            rows = await pool.fetch(
+                f"SELECT {_LISTING_COLUMNS}, "
+                "(SELECT count(*) FROM chat_messages c WHERE c.session_id = s.session_id) AS message_count "
+                "FROM chat_sessions s "
+                f"LEFT JOIN LATERAL (SELECT {_MESSAGE_COLUMNS} FROM chat_messages "
+                "WHERE session_id = s.session_id ORDER BY created_at DESC LIMIT 1) m ON true "
+                f"{where}"
+                f"ORDER BY s.updated_at DESC, s.session_id DESC LIMIT ${len(args)}",
+                *args
+            )
+
+            # No cargamos mensajes aquí para optimizar performance
+            sessions = [
+                self._to_chat_session(
+                    row,
+                    message_count=row["message_count"],
+                    last_message=ChatMessage(
+                        role=row["last_role"],
+                        content=row["last_content"],
+                        created_at=row["last_created_at"],
+                        metadata=row["last_metadata"]
+                    ) if row["last_role"] is not None else None
+                )
+                for row in rows
+            ]
+
+            logger.info(f"Retrieved {len(sessions)} sessions")
+            return sessions
+
+        except Exception as e:
+            logger.error(f"Error fetching all sessions: {str(e)}")
+            raise VectorStoreError(f"Error al obtener sesiones: {str(e)}")
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Devuelve el pool, creándolo en el primer uso"""
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    logger.info("Opening PostgreSQL connection pool for chat sessions")
+                    self._pool = await asyncpg.create_pool(
+                        dsn=self._dsn,
+                        min_size=self._min_size,
+                        max_size=self._max_size,
+                        max_inactive_connection_lifetime=self._max_idle_seconds,
+                        statement_cache_size=self._statement_cache_size,
+                        init=_init_connection
+                    )
+        return self._pool
+
+    @staticmethod
+    def _to_chat_session(
+        row: asyncpg.Record,
+        messages: Optional[List[ChatMessage]] = None,
+        message_count: Optional[int] = None,
+        last_message: Optional[ChatMessage] = None
+    ) -> ChatSession:
+        """
+        Convierte una fila de chat_sessions en ChatSession
+
+        asyncpg ya devuelve los timestamptz como datetime con zona horaria.
+
+        Args:
+            row: Fila de la tabla chat_sessions
+            messages: Mensajes de la sesión (vacío si no se cargan)
+            message_count: Total de mensajes, si se contaron sin cargarlos
+            last_message: Último mensaje, si se obtuvo sin cargar el historial
+
+        Returns:
+            ChatSession: Sesión con sus mensajes
+        """
+        return ChatSession(
+            session_id=row["session_id"],
+            user_id=row["user_id"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            metadata=row["metadata"],
+            messages=messages if messages is not None else [],
+            total_messages=message_count,
+            last_message=last_message
+        )
+
+    @staticmethod
+    def _to_chat_message(row: asyncpg.Record) -> ChatMessage:
+        """
+        Convierte una fila de chat_messages en ChatMessage
+
+        Args:
+            row: Fila de la tabla chat_messages
+
+        Returns:
+            ChatMessage: Mensaje de la sesión
+        """
+        return ChatMessage(
+            role=row["role"],
+            content=row["content"],
+            created_at=row["created_at"],
+            metadata=row["metadata"]
+        )
@@ -1,18 +1,27 @@
 """
 Implementación de IChatSessionStore usando Supabase
 """
+import asyncio
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
-from supabase import Client
+from supabase import AsyncClient
+from postgrest import APIError, CountMethod, ReturnMethod
 
 from domain.interfaces.chat_session_store import IChatSessionStore
 from domain.entities.chat_session import ChatSession
 from domain.entities.chat_message import ChatMessage
-from core.exceptions import VectorStoreError
+from core.exceptions import SessionAlreadyExistsError, VectorStoreError
 
 logger = logging.getLogger(__name__)
 
+# Código de PostgreSQL para violación de restricción UNIQUE
+_UNIQUE_VIOLATION = "23505"
+
+# Columnas que usan _to_chat_session / _to_chat_message
+_SESSION_COLUMNS = "session_id,user_id,created_at,updated_at,metadata"
+_MESSAGE_COLUMNS = "role,content,created_at,metadata"
+
 
 class SupabaseChatSessionStore(IChatSessionStore):
     """
@@ -22,12 +31,15 @@ class SupabaseChatSessionStore(IChatSessionStore):
     'chat_sessions' y 'chat_messages'.
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: AsyncClient):
         """
         Args:
             client: Cliente de Supabase configurado
         """
         self.client = client
+        # Los builders de tabla no guardan estado entre consultas: se crean una vez
+        self._sessions = client.table("chat_sessions")
+        self._messages = client.table("chat_messages")
 
     async def create_session(
         self,
@@ -45,20 +57,20 @@ class SupabaseChatSessionStore(IChatSessionStore):
                 "metadata": metadata or {}
             }
 
-            response = self.client.table("chat_sessions").insert(data).execute()
+            # Sin comprobación previa: la clave única de session_id decide
+            # de forma atómica si la sesión ya existía
+            response = await self._sessions.insert(data).execute()
 
             if not response.data:
                 raise VectorStoreError(f"No se pudo crear la sesión {session_id}")
 
-            session_data = response.data[0]
-            return ChatSession(
-                session_id=session_data["session_id"],
-                user_id=session_data.get("user_id"),
-                created_at=datetime.fromisoformat(session_data["created_at"]),
-                updated_at=datetime.fromisoformat(session_data["updated_at"]),
-                metadata=session_data.get("metadata"),
-                messages=[]
-            )
+            return self._to_chat_session(response.data[0])
+
+        except APIError as e:
+            if e.code == _UNIQUE_VIOLATION:
+                raise SessionAlreadyExistsError(f"Session {session_id} already exists")
+            logger.error(f"Error creating session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al crear sesión: {str(e)}")
 
         except Exception as e:
             logger.error(f"Error creating session {session_id}: {str(e)}")
@@ -69,43 +81,58 @@ class SupabaseChatSessionStore(IChatSessionStore):
         try:
             logger.info(f"Fetching session: {session_id}")
 
-            # Obtener sesión
-            session_response = self.client.table("chat_sessions")\
-                .select("*")\
+            # Sesión y mensajes en una sola petición: PostgREST embebe los
+            # mensajes (relación chat_messages.session_id) en la fila de la sesión
+            response = await self._sessions\
+                .select(f"{_SESSION_COLUMNS},chat_messages({_MESSAGE_COLUMNS})")\
                 .eq("session_id", session_id)\
+                .order("created_at", foreign_table="chat_messages")\
+                .limit(100, foreign_table="chat_messages")\
                 .execute()
 
-            if not session_response.data:
+            if not response.data:
                 logger.info(f"Session {session_id} not found")
                 return None
 
-            session_data = session_response.data[0]
+            row = response.data[0]
+            messages = [self._to_chat_message(message_row) for message_row in row["chat_messages"]]
+            return self._to_chat_session(row, messages)
 
-            # Obtener mensajes
-            messages = await self.get_messages(session_id, limit=100)
+        except Exception as e:
+            logger.error(f"Error fetching session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener sesión: {str(e)}")
 
-            return ChatSession(
-                session_id=session_data["session_id"],
-                user_id=session_data.get("user_id"),
-                created_at=datetime.fromisoformat(session_data["created_at"]),
-                updated_at=datetime.fromisoformat(session_data["updated_at"]),
-                metadata=session_data.get("metadata"),
-                messages=messages
-            )
+    async def get_session_summary(self, session_id: str) -> Optional[ChatSession]:
+        """Obtiene una sesión sin su historial, con el total de mensajes"""
+        try:
+            logger.info(f"Fetching session summary: {session_id}")
+
+            response = await self._sessions\
+                .select(f"{_SESSION_COLUMNS},chat_messages(count)")\
+                .eq("session_id", session_id)\
+                .execute()
+
+            if not response.data:
+                logger.info(f"Session {session_id} not found")
+                return None
+
+            row = response.data[0]
+            return self._to_chat_session(row, message_count=row["chat_messages"][0]["count"])
 
         except Exception as e:
-            logger.error(f"Error fetching session {session_id}: {str(e)}")
+            logger.error(f"Error fetching session summary {session_id}: {str(e)}")
             raise VectorStoreError(f"Error al obtener sesión: {str(e)}")
 
     async def session_exists(self, session_id: str) -> bool:
         """Verifica si una sesión existe"""
         try:
-            response = self.client.table("chat_sessions")\
-                .select("session_id")\
+            # HEAD con conteo: PostgREST responde sin cuerpo
+            response = await self._sessions\
+                .select("session_id", head=True, count=CountMethod.exact)\
                 .eq("session_id", session_id)\
                 .execute()
 
-            return len(response.data) > 0
+            return bool(response.count)
 
         except Exception as e:
             logger.error(f"Error checking session existence {session_id}: {str(e)}")
@@ -127,7 +154,7 @@ class SupabaseChatSessionStore(IChatSessionStore):
                 "metadata": message.metadata or {}
             }
 
-            response = self.client.table("chat_messages").insert(data).execute()
+            response = await self._messages.insert(data).execute()
 
             if not response.data:
                 raise VectorStoreError(f"No se pudo agregar mensaje a sesión {session_id}")
@@ -138,6 +165,42 @@ class SupabaseChatSessionStore(IChatSessionStore):
             logger.error(f"Error adding message to session {session_id}: {str(e)}")
             raise VectorStoreError(f"Error al agregar mensaje: {str(e)}")
 
+    async def add_messages(
+        self,
+        session_id: str,
+        messages: List[ChatMessage]
+    ) -> None:
+        """Agrega varios mensajes a una sesión con una sola inserción"""
+        if not messages:
+            return
+
+        try:
+            logger.info(f"Adding {len(messages)} messages to session {session_id}")
+
+            data = [
+                {
+                    "session_id": session_id,
+                    "role": message.role,
+                    "content": message.content,
+                    # El created_at del mensaje y no el now() de la inserción,
+                    # que sería el mismo para todas las filas
+                    "created_at": message.created_at.astimezone().isoformat(),
+                    "metadata": message.metadata or {}
+                }
+                for message in messages
+            ]
+
+            response = await self._messages.insert(data).execute()
+
+            if len(response.data) != len(messages):
+                raise VectorStoreError(f"No se pudieron agregar los mensajes a sesión {session_id}")
+
+            logger.info(f"Messages added successfully to session {session_id}")
+
+        except Exception as e:
+            logger.error(f"Error adding messages to session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al agregar mensajes: {str(e)}")
+
     async def get_messages(
         self,
         session_id: str,
@@ -147,21 +210,14 @@ class SupabaseChatSessionStore(IChatSessionStore):
         try:
             logger.info(f"Fetching messages for session {session_id} (limit: {limit})")
 
-            response = self.client.table("chat_messages")\
-                .select("*")\
+            response = await self._messages\
+                .select(_MESSAGE_COLUMNS)\
                 .eq("session_id", session_id)\
                 .order("created_at", desc=False)\
                 .limit(limit)\
                 .execute()
 
-            messages = []
-            for msg_data in response.data:
-                messages.append(ChatMessage(
-                    role=msg_data["role"],
-                    content=msg_data["content"],
-                    created_at=datetime.fromisoformat(msg_data["created_at"]),
-                    metadata=msg_data.get("metadata")
-                ))
+            messages = [self._to_chat_message(row) for row in response.data]
 
             logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
             return messages
@@ -170,12 +226,37 @@ class SupabaseChatSessionStore(IChatSessionStore):
             logger.error(f"Error fetching messages for session {session_id}: {str(e)}")
             raise VectorStoreError(f"Error al obtener mensajes: {str(e)}")
 
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None
+    ) -> List[ChatMessage]:
+        """Obtiene una página del historial (más recientes primero)"""
+        try:
+            logger.info(f"Fetching message page for session {session_id} (limit: {limit}, before: {before})")
+
+            query = self._messages.select(_MESSAGE_COLUMNS).eq("session_id", session_id)
+            if before:
+                query = query.lt("created_at", before.isoformat())
+
+            response = await query\
+                .order("created_at", desc=True)\
+                .limit(limit)\
+                .execute()
+
+            return [self._to_chat_message(row) for row in response.data]
+
+        except Exception as e:
+            logger.error(f"Error fetching message page for session {session_id}: {str(e)}")
+            raise VectorStoreError(f"Error al obtener mensajes: {str(e)}")
+
     async def delete_session(self, session_id: str) -> bool:
         """Elimina una sesión y todos sus mensajes (CASCADE)"""
         try:
             logger.info(f"Deleting session: {session_id}")
 
-            response = self.client.table("chat_sessions")\
+            response = await self._sessions\
                 .delete()\
                 .eq("session_id", session_id)\
                 .execute()
@@ -197,17 +278,19 @@ class SupabaseChatSessionStore(IChatSessionStore):
         try:
             logger.info(f"Clearing history for session: {session_id}")
 
-            # Verificar que la sesión existe
-            exists = await self.session_exists(session_id)
+            # Verificación y borrado en paralelo: si la sesión no existe no
+            # tiene mensajes, así que el DELETE no afecta a ninguna fila.
+            # Con returning=minimal no se devuelven las filas borradas
+            exists, _ = await asyncio.gather(
+                self.session_exists(session_id),
+                self._messages
+                    .delete(returning=ReturnMethod.minimal)
+                    .eq("session_id", session_id)
+                    .execute()
+            )
             if not exists:
                 return False
 
-            # Eliminar todos los mensajes
-            self.client.table("chat_messages")\
-                .delete()\
-                .eq("session_id", session_id)\
-                .execute()
-
             logger.info(f"History cleared for session {session_id}")
             return True
 
@@ -218,30 +301,49 @@ class SupabaseChatSessionStore(IChatSessionStore):
     async def get_all_sessions(
         self,
         user_id: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None
     ) -> List[ChatSession]:
-        """Obtiene todas las sesiones (opcionalmente filtradas por usuario)"""
+        """Obtiene todas las sesiones (opcionalmente filtradas por usuario y paginadas por cursor)"""
         try:
-            logger.info(f"Fetching all sessions (user_id: {user_id}, limit: {limit})")
+            logger.info(f"Fetching all sessions (user_id: {user_id}, limit: {limit}, before: {before})")
 
-            query = self.client.table("chat_sessions").select("*")
+            # chat_messages(count): conteo de mensajes por sesión en la misma
+            # consulta, sin traer los mensajes; last_message: el más reciente
+            # de cada sesión (orden y límite del embebido se aplican por sesión)
+            query = self._sessions.select(
+                f"{_SESSION_COLUMNS},chat_messages(count),last_message:chat_messages({_MESSAGE_COLUMNS})"
+            )
 
             if user_id:
                 query = query.eq("user_id", user_id)
 
-            response = query.order("updated_at", desc=True).limit(limit).execute()
+            if before:
+                # (updated_at, session_id) < cursor, expresado con or/and de PostgREST
+                updated_at = self._quote(before[0].isoformat())
+                session_id = self._quote(before[1])
+                query = query.or_(
+                    f"updated_at.lt.{updated_at},"
+                    f"and(updated_at.eq.{updated_at},session_id.lt.{session_id})"
+                )
+
+            response = await query\
+                .order("updated_at", desc=True)\
+                .order("session_id", desc=True)\
+                .order("created_at", desc=True, foreign_table="last_message")\
+                .limit(1, foreign_table="last_message")\
+                .limit(limit)\
+                .execute()
 
-            sessions = []
-            for session_data in response.data:
-                # No cargamos mensajes aquí para optimizar performance
-                sessions.append(ChatSession(
-                    session_id=session_data["session_id"],
-                    user_id=session_data.get("user_id"),
-                    created_at=datetime.fromisoformat(session_data["created_at"]),
-                    updated_at=datetime.fromisoformat(session_data["updated_at"]),
-                    metadata=session_data.get("metadata"),
-                    messages=[]  # Sin mensajes para listar
-                ))
+            # No cargamos mensajes aquí para optimizar performance
+            sessions = [
+                self._to_chat_session(
+                    row,
+                    message_count=row["chat_messages"][0]["count"],
+                    last_message=self._to_chat_message(row["last_message"][0]) if row["last_message"] else None
+                )
+                for row in response.data
+            ]
 
             logger.info(f"Retrieved {len(sessions)} sessions")
             return sessions
@@ -249,3 +351,60 @@ class SupabaseChatSessionStore(IChatSessionStore):
         except Exception as e:
             logger.error(f"Error fetching all sessions: {str(e)}")
             raise VectorStoreError(f"Error al obtener sesiones: {str(e)}")
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        """Entrecomilla un valor para usarlo dentro de un filtro or/and de PostgREST"""
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+
+    @staticmethod
+    def _to_chat_session(
+        row: dict,
+        messages: Optional[List[ChatMessage]] = None,
+        message_count: Optional[int] = None,
+        last_message: Optional[ChatMessage] = None
+    ) -> ChatSession:
+        """
+        Convierte una fila de chat_sessions en ChatSession
+
+        Los timestamps de PostgREST (ISO 8601, con 'Z' u offset) se parsean
+        con datetime.fromisoformat, que en Python 3.11 los acepta tal cual.
+
+        Args:
+            row: Fila de la tabla chat_sessions
+            messages: Mensajes de la sesión (vacío si no se cargan)
+            message_count: Total de mensajes, si se contaron sin cargarlos
+            last_message: Último mensaje, si se obtuvo sin cargar el historial
+
+        Returns:
+            ChatSession: Sesión con sus mensajes
+        """
+        return ChatSession(
+            session_id=row["session_id"],
+            user_id=row.get("user_id"),
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+            metadata=row.get("metadata"),
+            messages=messages if messages is not None else [],
+            total_messages=message_count,
+            last_message=last_message
+        )
+
+    @staticmethod
+    def _to_chat_message(row: dict) -> ChatMessage:
+        """
+        Convierte una fila de chat_messages en ChatMessage
+
+        Args:
+            row: Fila de la tabla chat_messages
+
+        Returns:
+            ChatMessage: Mensaje de la sesión
+        """
+        return ChatMessage(
+            role=row["role"],
+            content=row["content"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            metadata=row.get("metadata")
+        )
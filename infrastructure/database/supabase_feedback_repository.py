@@ -4,7 +4,7 @@ Implementación de IFeedbackRepository usando Supabase
 import logging
 from typing import Optional
 from datetime import datetime
-from supabase import Client
+from supabase import AsyncClient
 
 from domain.interfaces.feedback_repository import IFeedbackRepository
 from domain.entities.feedback import Feedback, ExactitudMetrics
@@ -21,12 +21,14 @@ class SupabaseFeedbackRepository(IFeedbackRepository):
     Fórmula: Exactitud = (Correctas / Total Evaluadas) × 100
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: AsyncClient):
         """
         Args:
             client: Cliente de Supabase configurado
         """
         self.client = client
+        # Los builders de tabla no guardan estado entre consultas: se crean una vez
+        self._feedback = client.table("rag_feedback")
 
     async def save_feedback(self, feedback: Feedback) -> Feedback:
         """Guarda el feedback del usuario"""
@@ -47,7 +49,7 @@ class SupabaseFeedbackRepository(IFeedbackRepository):
                 "metadata": feedback.metadata or {}
             }
 
-            response = self.client.table("rag_feedback").insert(data).execute()
+            response = await self._feedback.insert(data).execute()
 
             if not response.data:
                 raise VectorStoreError("No se pudo guardar el feedback")
@@ -89,7 +91,7 @@ class SupabaseFeedbackRepository(IFeedbackRepository):
                 logger.warning("No data to update")
                 return False
 
-            response = self.client.table("rag_feedback")\
+            response = await self._feedback\
                 .update(update_data)\
                 .eq("message_id", message_id)\
                 .execute()
@@ -116,7 +118,7 @@ class SupabaseFeedbackRepository(IFeedbackRepository):
             logger.info(f"Calculating exactitud metrics for last {days} days")
 
             # Llamar a la función SQL que calcula las métricas
-            response = self.client.rpc("calculate_exactitud", {
+            response = await self.client.rpc("calculate_exactitud", {
                 "p_days": days
             }).execute()
 
@@ -159,7 +161,7 @@ class SupabaseFeedbackRepository(IFeedbackRepository):
         try:
             logger.info(f"Fetching feedback for message: {message_id}")
 
-            response = self.client.table("rag_feedback")\
+            response = await self._feedback\
                 .select("*")\
                 .eq("message_id", message_id)\
                 .execute()
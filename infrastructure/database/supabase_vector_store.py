@@ -1,13 +1,20 @@
 """
 Supabase Vector Store - Implementación de almacenamiento vectorial
 """
+import asyncio
+from collections import Counter
 from typing import List, Dict
 import logging
-from supabase import Client
+from supabase import AsyncClient
+from postgrest import CountMethod
 from domain.interfaces.vector_store import IVectorStore
+from domain.entities.query_result import SimilarChunk
 
 logger = logging.getLogger(__name__)
 
+# Columnas de documents que usa get_statistics
+_STATS_COLUMNS = 'total_pages,category,document_type'
+
 
 class SupabaseVectorStore(IVectorStore):
     """
@@ -16,7 +23,7 @@ class SupabaseVectorStore(IVectorStore):
     Usa la función RPC search_similar_chunks() para búsqueda vectorial
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: AsyncClient):
         """
         Initialize Supabase vector store
 
@@ -24,6 +31,9 @@ class SupabaseVectorStore(IVectorStore):
             client: Supabase client instance
         """
         self._client = client
+        # Los builders de tabla no guardan estado entre consultas: se crean una vez
+        self._documents = client.table('documents')
+        self._chunks = client.table('document_chunks')
         logger.info("SupabaseVectorStore initialized")
 
     async def search_similar_chunks(
@@ -31,7 +41,7 @@ class SupabaseVectorStore(IVectorStore):
         embedding: List[float],
         threshold: float,
         limit: int
-    ) -> List[Dict]:
+    ) -> List[SimilarChunk]:
         """
         Busca chunks similares usando búsqueda vectorial
 
@@ -41,7 +51,7 @@ class SupabaseVectorStore(IVectorStore):
             limit: Número máximo de resultados
 
         Returns:
-            List[Dict]: Lista de chunks con metadata
+            List[SimilarChunk]: Chunks encontrados con su score de similitud
         """
         try:
             logger.info(
@@ -49,7 +59,7 @@ class SupabaseVectorStore(IVectorStore):
             )
 
             # Llamar a la función RPC de Supabase
-            result = self._client.rpc(
+            result = await self._client.rpc(
                 'search_similar_chunks',
                 {
                     'query_embedding': embedding,
@@ -58,7 +68,7 @@ class SupabaseVectorStore(IVectorStore):
                 }
             ).execute()
 
-            chunks = result.data if result.data else []
+            chunks = [self._to_similar_chunk(row) for row in result.data or []]
             logger.info(f"Found {len(chunks)} similar chunks")
 
             return chunks
@@ -67,6 +77,27 @@ class SupabaseVectorStore(IVectorStore):
             logger.error(f"Error searching similar chunks: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _to_similar_chunk(row: Dict) -> SimilarChunk:
+        """
+        Convierte una fila del RPC search_similar_chunks en SimilarChunk
+
+        Args:
+            row: Fila devuelta por Supabase
+
+        Returns:
+            SimilarChunk: Chunk con acceso por atributos
+        """
+        chunk_id = row.get('id', row.get('chunk_id'))
+        return SimilarChunk(
+            text=row.get('chunk_text') or '',
+            document_name=row.get('filename') or '',
+            document_id=row.get('document_id'),
+            page_number=row.get('page_number') or 0,
+            similarity_score=row.get('similarity', 0.0),
+            chunk_id=str(chunk_id) if chunk_id is not None else None
+        )
+
     async def get_document_count(self) -> int:
         """
         Obtiene el total de documentos almacenados
@@ -75,8 +106,9 @@ class SupabaseVectorStore(IVectorStore):
             int: Número total de documentos
         """
         try:
-            result = self._client.table('documents')\
-                .select('*', count='exact')\
+            # HEAD con conteo: solo se transfiere el total, no las filas
+            result = await self._documents\
+                .select('*', head=True, count=CountMethod.exact)\
                 .execute()
 
             count = result.count if result.count is not None else 0
@@ -96,8 +128,9 @@ class SupabaseVectorStore(IVectorStore):
             int: Número total de chunks
         """
         try:
-            result = self._client.table('document_chunks')\
-                .select('*', count='exact')\
+            # HEAD con conteo: no se descargan los chunks (ni sus embeddings)
+            result = await self._chunks\
+                .select('*', head=True, count=CountMethod.exact)\
                 .execute()
 
             count = result.count if result.count is not None else 0
@@ -119,42 +152,33 @@ class SupabaseVectorStore(IVectorStore):
         try:
             logger.info("Retrieving database statistics...")
 
-            # Get all documents
-            documents_result = self._client.table('documents')\
-                .select('*', count='exact')\
-                .execute()
+            # Documentos (solo las columnas que se agregan) y conteo de chunks
+            # (HEAD: sin descargar filas ni embeddings) en paralelo
+            documents_result, total_chunks = await asyncio.gather(
+                self._documents
+                    .select(_STATS_COLUMNS, count=CountMethod.exact)
+                    .execute(),
+                self.get_chunk_count()
+            )
 
             documents = documents_result.data if documents_result.data else []
             total_documents = documents_result.count or 0
 
-            # Get all chunks
-            chunks_result = self._client.table('document_chunks')\
-                .select('*', count='exact')\
-                .execute()
-
-            total_chunks = chunks_result.count or 0
-
-            # Calculate aggregates
-            total_pages = sum(doc.get('total_pages', 0) for doc in documents)
-
-            # Group by category
-            categories = {}
-            for doc in documents:
-                category = doc.get('category', 'Sin categoría')
-                categories[category] = categories.get(category, 0) + 1
-
-            # Group by document type
-            document_types = {}
+            # Calculate aggregates in a single pass
+            total_pages = 0
+            categories = Counter()
+            document_types = Counter()
             for doc in documents:
-                doc_type = doc.get('document_type', 'Sin tipo')
-                document_types[doc_type] = document_types.get(doc_type, 0) + 1
+                total_pages += doc['total_pages'] or 0
+                categories[doc['category'] or 'Sin categoría'] += 1
+                document_types[doc['document_type'] or 'Sin tipo'] += 1
 
             stats = {
                 'total_documents': total_documents,
                 'total_chunks': total_chunks,
                 'total_pages': total_pages,
-                'categories': categories,
-                'document_types': document_types
+                'categories': dict(categories),
+                'document_types': dict(document_types)
             }
 
             logger.info(f"Statistics: {stats}")
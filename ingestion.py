@@ -1,38 +1,87 @@
 import os
 import re
+import atexit
 import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from pypdf import PdfReader
 from sentence_transformers import SentenceTransformer
 
 # --- 1. CONFIGURACIÓN INICIAL ---
-print("🚀 Iniciando el script de ingestión de documentos (Versión Mejorada)...")
-load_dotenv('.env.local')
 
-SUPABASE_URL = os.environ.get("VITE_SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("VITE_SUPABASE_ANON_KEY")
+def init_services() -> tuple[Client, SentenceTransformer]:
+    """
+    Crea el cliente de Supabase y carga el modelo de embeddings.
+
+    Se llama desde main() y no al importar el módulo: los procesos que
+    extraen páginas en paralelo importan este script y no deben repetirlo.
+    """
+    print("🚀 Iniciando el script de ingestión de documentos (Versión Mejorada)...")
+    load_dotenv('.env.local')
+
+    supabase_url = os.environ.get("VITE_SUPABASE_URL")
+    supabase_key = os.environ.get("VITE_SUPABASE_ANON_KEY")
+
+    if not supabase_url or not supabase_key:
+        raise ValueError("❌ Las variables de entorno de Supabase no están configuradas.")
+
+    supabase: Client = create_client(supabase_url, supabase_key)
+
+    # EMBEDDING_BACKEND=onnx usa la exportación ONNX cuantizada a int8 que publica
+    # el propio modelo (ONNX Runtime, más rápido en CPU que PyTorch)
+    embedding_backend = os.environ.get("EMBEDDING_BACKEND", "torch")
+    embedding_onnx_file = os.environ.get("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+
+    # EMBEDDING_NUM_THREADS fija los hilos de inferencia de PyTorch: en
+    # contenedores su valor por defecto se basa en los núcleos del host y no
+    # en los asignados al proceso
+    num_threads = os.environ.get("EMBEDDING_NUM_THREADS")
+    if num_threads and embedding_backend != "onnx":
+        import torch
+        torch.set_num_threads(int(num_threads))
+        torch.set_num_interop_threads(1)
+
+    print(f"🧠 Cargando modelo de embeddings 'all-MiniLM-L6-v2' (backend: {embedding_backend})...")
+    if embedding_backend == "onnx":
+        model = SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            backend="onnx",
+            model_kwargs={"file_name": embedding_onnx_file}
+        )
+    else:
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+    print("✅ Modelo cargado.")
+
+    return supabase, model
+
+# Filas de document_chunks por petición de inserción
+CHUNK_INSERT_BATCH_SIZE = 500
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("❌ Las variables de entorno de Supabase no están configuradas.")
+# Hashes ya calculados, por ruta, tamaño y fecha de modificación del PDF
+HASH_CACHE_FILE = '.ingest_cache.json'
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Hashes por consulta al comprobar qué documentos ya existen
+HASH_LOOKUP_BATCH_SIZE = 100
 
-print("🧠 Cargando modelo de embeddings 'all-MiniLM-L6-v2'...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("✅ Modelo cargado.")
+# A partir de cuántas páginas se extrae el texto en varios procesos
+PARALLEL_EXTRACTION_MIN_PAGES = 20
 
 # --- 2. FUNCIONES DE PROCESAMIENTO DE TEXTO ---
 
+# Guion de corte de palabra al final de una línea (entre dos caracteres de palabra)
+_HYPHEN_LINE_BREAK = re.compile(r'(?<=\w)-\n(?=\w)')
+
 def clean_pdf_text(text: str) -> str:
     """
     Limpia el texto extraído de un PDF.
     - Une palabras cortadas por guiones al final de una línea.
     - Normaliza los espacios en blanco y saltos de línea.
     """
-    text = re.sub(r'(\w+)-\n(\w+)', r'\1\2', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    text = _HYPHEN_LINE_BREAK.sub('', text)
+    # split() sin argumentos descarta cualquier racha de espacios en un solo paso
+    return ' '.join(text.split())
 
 def split_text_into_semantic_chunks(text: str, max_chars: int = 1000, overlap: int = 150) -> list[str]:
     """
@@ -42,61 +91,151 @@ def split_text_into_semantic_chunks(text: str, max_chars: int = 1000, overlap: i
     if not sentences:
         return []
 
+    # El chunk en curso se acumula como lista de fragmentos y solo se une al
+    # emitirlo: cada frase se copia una vez en vez de en cada concatenación
     chunks = []
-    current_chunk = ""
+    parts: list[str] = []
+    length = 0
     for sentence in sentences:
-        if len(current_chunk) + len(sentence) + 1 < max_chars:
-            current_chunk += sentence + " "
+        if length + len(sentence) + 1 < max_chars:
+            parts.append(sentence + " ")
+            length += len(sentence) + 1
         else:
+            current_chunk = "".join(parts)
             if current_chunk:
                 chunks.append(current_chunk.strip())
-            
+
             # El overlap asegura que el inicio del nuevo chunk contenga el final del anterior
-            start_index = max(0, len(current_chunk) - overlap)
-            current_chunk = current_chunk[start_index:].strip() + " " + sentence + " "
-            
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-        
+            start_index = max(0, length - overlap)
+            first_part = current_chunk[start_index:].strip() + " " + sentence + " "
+            parts = [first_part]
+            length = len(first_part)
+
+    if parts:
+        chunks.append("".join(parts).strip())
+
     return chunks
 
+def extract_pages_text(file_path: str, start: int, stop: int) -> str:
+    """Extrae el texto de las páginas [start, stop) de un PDF (una sola vez por página)."""
+    reader = PdfReader(file_path)
+    return "".join(reader.pages[i].extract_text() or "" for i in range(start, stop))
+
+def extract_pdf_text(file_path: str, total_pages: int) -> str:
+    """
+    Extrae el texto de todas las páginas en orden.
+
+    pypdf es CPU-bound: en documentos grandes las páginas se reparten en
+    rangos contiguos entre procesos (cada uno abre el PDF una sola vez).
+    """
+    workers = min(os.cpu_count() or 1, total_pages // PARALLEL_EXTRACTION_MIN_PAGES)
+    if workers <= 1:
+        return extract_pages_text(file_path, 0, total_pages)
+
+    bounds = [total_pages * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(
+            extract_pages_text,
+            [file_path] * workers,
+            bounds[:-1],
+            bounds[1:]
+        )
+        return "".join(parts)
+
 def get_file_hash(file_path: str) -> str:
     """Calcula el hash SHA256 de un archivo para evitar duplicados."""
-    sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        # file_digest (Python 3.11+) lee el archivo con un buffer propio y
+        # sin pasar cada bloque por el intérprete
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(1 << 20), b""):
             sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+        return sha256_hash.hexdigest()
+
+def load_hash_cache() -> dict:
+    """Carga el cache local de hashes (vacío si no existe o está corrupto)."""
+    try:
+        with open(HASH_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_hash_cache(cache: dict) -> None:
+    """Guarda el cache local de hashes."""
+    with open(HASH_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+def get_cached_file_hash(file_path: str, cache: dict) -> str:
+    """
+    Devuelve el hash del archivo, recalculándolo solo si cambió.
+
+    Un PDF con la misma ruta, tamaño y mtime que en la ejecución anterior
+    reutiliza su hash sin volver a leerse del disco.
+    """
+    stat = os.stat(file_path)
+    entry = cache.get(file_path)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["file_hash"]
+
+    file_hash = get_file_hash(file_path)
+    cache[file_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "file_hash": file_hash}
+    return file_hash
+
+def fetch_existing_hashes(supabase: Client, file_hashes: list[str]) -> set[str]:
+    """
+    Devuelve cuáles de los hashes ya están registrados en documents.
+
+    Una consulta 'in' por lote en vez de una por PDF; el lote acota la
+    longitud de la URL de la petición.
+    """
+    existing = set()
+    unique_hashes = list(dict.fromkeys(file_hashes))
+    for start in range(0, len(unique_hashes), HASH_LOOKUP_BATCH_SIZE):
+        batch = unique_hashes[start:start + HASH_LOOKUP_BATCH_SIZE]
+        result = supabase.table('documents').select('file_hash').in_('file_hash', batch).execute()
+        existing.update(row['file_hash'] for row in result.data)
+    return existing
 
 # --- 3. LÓGICA PRINCIPAL ---
 
 def main():
+    supabase, model = init_services()
+
     path_to_documents = 'documentos_a_procesar'
     if not os.path.exists(path_to_documents):
         os.makedirs(path_to_documents)
         print(f"📂 Se creó la carpeta '{path_to_documents}'. Agrega tus PDFs y vuelve a ejecutar.")
         return
 
-    for filename in os.listdir(path_to_documents):
-        if not filename.lower().endswith('.pdf'):
-            continue
+    # Se guarda al salir, también si la ejecución se interrumpe a medias
+    hash_cache = load_hash_cache()
+    atexit.register(save_hash_cache, hash_cache)
 
+    pdf_filenames = [f for f in os.listdir(path_to_documents) if f.lower().endswith('.pdf')]
+    file_hashes = {
+        filename: get_cached_file_hash(os.path.join(path_to_documents, filename), hash_cache)
+        for filename in pdf_filenames
+    }
+    known_hashes = fetch_existing_hashes(supabase, list(file_hashes.values()))
+
+    for filename in pdf_filenames:
         file_path = os.path.join(path_to_documents, filename)
         print(f"\n--- Procesando: {filename} ---")
 
         # 1. Evitar duplicados
-        file_hash = get_file_hash(file_path)
-        result = supabase.table('documents').select('id').eq('file_hash', file_hash).execute()
-        if result.data:
+        file_hash = file_hashes[filename]
+        if file_hash in known_hashes:
             print(f"🟡 Documento ya procesado. Saltando.")
             continue
 
         # 2. Extraer y limpiar texto
         try:
-            reader = PdfReader(file_path)
-            raw_text = "".join(page.extract_text() for page in reader.pages if page.extract_text())
+            total_pages = len(PdfReader(file_path).pages)
+            raw_text = extract_pdf_text(file_path, total_pages)
             clean_text = clean_pdf_text(raw_text)
-            total_pages = len(reader.pages)
         except Exception as e:
             print(f"❌ Error al leer el PDF '{filename}': {e}")
             continue
@@ -109,21 +248,31 @@ def main():
         doc_data = { 'filename': filename, 'file_hash': file_hash, 'total_pages': total_pages }
         doc_res = supabase.table('documents').insert(doc_data).execute()
         document_id = doc_res.data[0]['id']
+        known_hashes.add(file_hash)
         print(f"📄 Documento '{filename}' registrado con ID: {document_id}")
 
         # 4. Dividir, generar embeddings y guardar chunks
         chunks = split_text_into_semantic_chunks(clean_text)
-        
-        for i, chunk_text in enumerate(chunks):
-            embedding = model.encode(chunk_text).tolist()
-            chunk_data = {
+
+        # Un solo encode por documento: el modelo procesa los chunks por lotes
+        # (ordenados internamente por longitud para minimizar el padding) y
+        # devuelve los embeddings en el orden original
+        embeddings = model.encode(chunks, batch_size=64, convert_to_numpy=True).tolist()
+
+        rows = [
+            {
                 'document_id': document_id,
                 'chunk_text': chunk_text,
                 'chunk_index': i,
                 'embedding': embedding
             }
-            supabase.table('document_chunks').insert(chunk_data).execute()
-        
+            for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings))
+        ]
+
+        # Inserción multi-fila por lotes para no superar el tamaño máximo de petición
+        for start in range(0, len(rows), CHUNK_INSERT_BATCH_SIZE):
+            supabase.table('document_chunks').insert(rows[start:start + CHUNK_INSERT_BATCH_SIZE]).execute()
+
         print(f"💾 {len(chunks)} chunks de texto limpio guardados.")
 
         # 5. Marcar como procesado
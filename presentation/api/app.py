@@ -1,18 +1,37 @@
 """
 FastAPI Application Factory
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 
 from .routes import rag_router, session_router, feedback_router
 from .schemas import HealthResponse
 from infrastructure.config.settings import get_settings
 from presentation.middleware.error_handler import setup_exception_handlers
+from .dependencies import get_postgres_session_store, warm_up_dependencies
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicializa los servicios al arrancar y abre/cierra el pool de PostgreSQL
+    de las sesiones (si está configurado)
+    """
+    warm_up_dependencies()
+
+    postgres_store = get_postgres_session_store()
+    if postgres_store is not None:
+        await postgres_store.connect()
+    yield
+    if postgres_store is not None:
+        await postgres_store.close()
+
+
 def create_app() -> FastAPI:
     """
     Create and configure FastAPI application
@@ -28,7 +47,10 @@ def create_app() -> FastAPI:
         version=settings.VERSION,
         description="RAG system for municipal procedures",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        # orjson serializa las respuestas de los endpoints con response_model
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
 
     # Configure CORS
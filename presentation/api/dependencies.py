@@ -6,30 +6,50 @@ en los endpoints de la API.
 """
 from functools import lru_cache
 from fastapi import Depends
-from supabase import create_client, Client
-from typing import Annotated
+from supabase import AsyncClient, AsyncClientOptions
+from typing import TYPE_CHECKING, Annotated, Optional
 
 from application.use_cases.query_rag import QueryRAGUseCase
 from application.use_cases.get_statistics import GetStatisticsUseCase
+from application.cache.semantic_cache import SemanticCache
+from application.cache.context_cache import ContextCache
 from infrastructure.ai.gemini_embedding_service import GeminiEmbeddingService
 from infrastructure.ai.gemini_chat_service import GeminiChatService
+from infrastructure.ai.batching_embedding_service import BatchingEmbeddingService
+from infrastructure.ai.caching_embedding_service import CachingEmbeddingService
 from infrastructure.database.supabase_vector_store import SupabaseVectorStore
 from infrastructure.database.supabase_chat_session_store import SupabaseChatSessionStore
+from infrastructure.database.caching_chat_session_store import CachingChatSessionStore
 from infrastructure.database.supabase_feedback_repository import SupabaseFeedbackRepository
 from infrastructure.config.settings import get_settings
 
+if TYPE_CHECKING:
+    from infrastructure.database.postgres_chat_session_store import PostgresChatSessionStore
+
 
 # ========== Infrastructure Dependencies ==========
 
 @lru_cache()
-def get_embedding_service() -> GeminiEmbeddingService:
+def get_embedding_service() -> CachingEmbeddingService:
     """
     Singleton: Servicio de embeddings con Gemini
 
+    Los textos ya embeddeados se sirven desde un cache LRU y las consultas
+    concurrentes restantes se agrupan en una sola llamada a la API.
+
     Returns:
-        GeminiEmbeddingService: Instancia única del servicio
+        CachingEmbeddingService: Instancia única del servicio
     """
-    return GeminiEmbeddingService()
+    settings = get_settings()
+    batching = BatchingEmbeddingService(
+        GeminiEmbeddingService(),
+        max_batch=settings.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+    )
+    return CachingEmbeddingService(
+        batching,
+        max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+    )
 
 
 @lru_cache()
@@ -44,20 +64,29 @@ def get_chat_service() -> GeminiChatService:
 
 
 @lru_cache()
-def get_supabase_client() -> Client:
+def get_supabase_client() -> AsyncClient:
     """
-    Singleton: Cliente de Supabase
+    Singleton: Cliente asíncrono de Supabase
+
+    Se construye directamente en vez de con create_async_client (que es una
+    corrutina): autenticando con la API key, el constructor ya configura las
+    mismas cabeceras de autorización. Al ser único, todas las peticiones
+    comparten su cliente HTTP/2 de PostgREST y sus conexiones abiertas.
 
     Returns:
-        Client: Instancia única del cliente Supabase
+        AsyncClient: Instancia única del cliente Supabase
     """
     settings = get_settings()
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return AsyncClient(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_KEY,
+        options=AsyncClientOptions(postgrest_client_timeout=settings.SUPABASE_HTTP_TIMEOUT_SECONDS)
+    )
 
 
 @lru_cache()
 def get_vector_store(
-    supabase_client: Annotated[Client, Depends(get_supabase_client)]
+    supabase_client: Annotated[AsyncClient, Depends(get_supabase_client)]
 ) -> SupabaseVectorStore:
     """
     Singleton: Vector store con Supabase
@@ -71,25 +100,61 @@ def get_vector_store(
     return SupabaseVectorStore(supabase_client)
 
 
+@lru_cache()
+def get_postgres_session_store() -> Optional["PostgresChatSessionStore"]:
+    """
+    Singleton: Session store con conexión directa a PostgreSQL
+
+    Solo existe si SUPABASE_DB_DSN está configurado; el pool se abre y
+    se cierra con el ciclo de vida de la aplicación. El módulo (y con él
+    asyncpg) se importa solo en ese caso.
+
+    Returns:
+        Optional[PostgresChatSessionStore]: Instancia única, o None sin DSN
+    """
+    settings = get_settings()
+    if not settings.SUPABASE_DB_DSN:
+        return None
+
+    from infrastructure.database.postgres_chat_session_store import PostgresChatSessionStore
+    return PostgresChatSessionStore(
+        settings.SUPABASE_DB_DSN,
+        min_size=settings.SUPABASE_DB_POOL_MIN_SIZE,
+        max_size=settings.SUPABASE_DB_POOL_MAX_SIZE,
+        max_idle_seconds=settings.SUPABASE_DB_POOL_MAX_IDLE_SECONDS,
+        statement_cache_size=settings.SUPABASE_DB_STATEMENT_CACHE_SIZE
+    )
+
+
 @lru_cache()
 def get_session_store(
-    supabase_client: Annotated[Client, Depends(get_supabase_client)]
-) -> SupabaseChatSessionStore:
+    supabase_client: Annotated[AsyncClient, Depends(get_supabase_client)]
+) -> CachingChatSessionStore:
     """
     Singleton: Chat session store con Supabase
 
+    Con SUPABASE_DB_DSN configurado las sesiones van por asyncpg contra
+    PostgreSQL; si no, por PostgREST. Las lecturas repetidas de una sesión se sirven desde un cache TTL
+    que se invalida con cada escritura sobre la sesión.
+
     Args:
         supabase_client: Cliente de Supabase (inyectado)
 
     Returns:
-        SupabaseChatSessionStore: Instancia única del session store
+        CachingChatSessionStore: Instancia única del session store
     """
-    return SupabaseChatSessionStore(supabase_client)
+    settings = get_settings()
+    store = get_postgres_session_store() or SupabaseChatSessionStore(supabase_client)
+    return CachingChatSessionStore(
+        store,
+        max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS
+    )
 
 
 @lru_cache()
 def get_feedback_repository(
-    supabase_client: Annotated[Client, Depends(get_supabase_client)]
+    supabase_client: Annotated[AsyncClient, Depends(get_supabase_client)]
 ) -> SupabaseFeedbackRepository:
     """
     Singleton: Feedback repository con Supabase
@@ -103,13 +168,43 @@ def get_feedback_repository(
     return SupabaseFeedbackRepository(supabase_client)
 
 
+@lru_cache()
+def get_semantic_cache() -> SemanticCache:
+    """
+    Singleton: Cache semántico de respuestas RAG
+
+    Returns:
+        SemanticCache: Instancia única del cache (compartida entre requests)
+    """
+    settings = get_settings()
+    return SemanticCache(
+        max_entries=settings.RAG_CACHE_MAX_ENTRIES,
+        similarity_threshold=settings.RAG_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds=settings.RAG_CACHE_TTL_SECONDS
+    )
+
+
+@lru_cache()
+def get_context_cache() -> ContextCache:
+    """
+    Singleton: Cache del contexto construido a partir de los chunks
+
+    Returns:
+        ContextCache: Instancia única del cache (compartida entre requests)
+    """
+    settings = get_settings()
+    return ContextCache(max_entries=settings.RAG_CONTEXT_CACHE_MAX_ENTRIES)
+
+
 # ========== Use Case Dependencies ==========
 
 def get_query_rag_use_case(
-    embedding_service: Annotated[GeminiEmbeddingService, Depends(get_embedding_service)],
+    embedding_service: Annotated[CachingEmbeddingService, Depends(get_embedding_service)],
     vector_store: Annotated[SupabaseVectorStore, Depends(get_vector_store)],
     chat_service: Annotated[GeminiChatService, Depends(get_chat_service)],
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)]
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)],
+    semantic_cache: Annotated[SemanticCache, Depends(get_semantic_cache)],
+    context_cache: Annotated[ContextCache, Depends(get_context_cache)]
 ) -> QueryRAGUseCase:
     """
     Factory: Caso de uso QueryRAG con dependencias inyectadas (incluye session store)
@@ -119,6 +214,8 @@ def get_query_rag_use_case(
         vector_store: Vector store (inyectado)
         chat_service: Servicio de chat (inyectado)
         session_store: Chat session store (inyectado)
+        semantic_cache: Cache semántico de respuestas (inyectado)
+        context_cache: Cache de contexto por chunks (inyectado)
 
     Returns:
         QueryRAGUseCase: Instancia del caso de uso con dependencias
@@ -131,15 +228,20 @@ def get_query_rag_use_case(
         session_store=session_store,
         similarity_threshold=settings.RAG_SIMILARITY_THRESHOLD,
         top_k=settings.RAG_TOP_K_RESULTS,
-        max_history_messages=10  # Limitar historial a 10 mensajes
+        max_history_messages=10,  # Limitar historial a 10 mensajes
+        semantic_cache=semantic_cache,
+        context_cache=context_cache
     )
 
 
+@lru_cache()
 def get_statistics_use_case(
     vector_store: Annotated[SupabaseVectorStore, Depends(get_vector_store)]
 ) -> GetStatisticsUseCase:
     """
-    Factory: Caso de uso GetStatistics con dependencias inyectadas
+    Singleton: Caso de uso GetStatistics con dependencias inyectadas
+
+    Es único para que su cache TTL de estadísticas se comparta entre requests.
 
     Args:
         vector_store: Vector store (inyectado)
@@ -147,4 +249,28 @@ def get_statistics_use_case(
     Returns:
         GetStatisticsUseCase: Instancia del caso de uso
     """
-    return GetStatisticsUseCase(vector_store=vector_store)
+    settings = get_settings()
+    return GetStatisticsUseCase(
+        vector_store=vector_store,
+        cache_ttl_seconds=settings.STATS_CACHE_TTL_SECONDS
+    )
+
+
+def warm_up_dependencies() -> None:
+    """
+    Construye los singletons al arrancar la aplicación
+
+    Así la primera petición no paga la configuración de Gemini ni la
+    creación de clientes y caches. Se llaman con los mismos argumentos
+    por nombre que usa FastAPI al resolver Depends, para que lru_cache
+    devuelva después estas mismas instancias.
+    """
+    supabase_client = get_supabase_client()
+    get_embedding_service()
+    get_chat_service()
+    get_semantic_cache()
+    get_context_cache()
+    vector_store = get_vector_store(supabase_client=supabase_client)
+    get_session_store(supabase_client=supabase_client)
+    get_feedback_repository(supabase_client=supabase_client)
+    get_statistics_use_case(vector_store=vector_store)
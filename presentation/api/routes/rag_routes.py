@@ -1,24 +1,78 @@
 """
 RAG API Routes - Endpoints para consultas y estadísticas
 """
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from functools import lru_cache
+from typing import AsyncIterator, Annotated, Dict
+import gzip
 import logging
 
+import orjson
+
 from ..schemas import QueryRequest, QueryResponse, StatisticsResponse
 from ..dependencies import get_query_rag_use_case, get_statistics_use_case
 from application.use_cases.query_rag import QueryRAGUseCase
 from application.use_cases.get_statistics import GetStatisticsUseCase
-from application.dtos.query_dto import QueryInput
+from application.dtos.query_dto import QueryInput, QueryOutput
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/rag", tags=["RAG"])
 
 
+@lru_cache(maxsize=16)
+def _gzip_static_body(body: bytes) -> bytes:
+    """Comprime una sola vez el cuerpo de cada respuesta estática"""
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _accepts_gzip(http_request: Request) -> bool:
+    """
+    Indica si el cliente acepta respuestas gzip (Accept-Encoding)
+
+    Lee el parámetro q por nombre entre los parámetros de cada codificación.
+    Una entrada explícita de gzip tiene prioridad sobre el comodín "*".
+    """
+    weights: Dict[str, float] = {}
+    for coding in http_request.headers.get("accept-encoding", "").split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        name = name.lower()
+        if name not in ("gzip", "*"):
+            continue
+
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _static_response(output_dto: QueryOutput, http_request: Request) -> Response:
+    """
+    Respuesta JSON de un comando especial, comprimida si el cliente lo acepta
+
+    El contenido de los comandos especiales es fijo, así que el cuerpo
+    comprimido se calcula una vez y se reutiliza.
+    """
+    body = output_dto.to_json()
+    headers = {"Vary": "Accept-Encoding"}
+    if _accepts_gzip(http_request):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip_static_body(body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/query", response_model=QueryResponse)
 async def query_rag(
     request: QueryRequest,
+    http_request: Request,
     use_case: Annotated[QueryRAGUseCase, Depends(get_query_rag_use_case)]
 ):
     """
@@ -34,6 +88,7 @@ async def query_rag(
 
     Args:
         request: QueryRequest con la consulta del usuario (y session_id opcional)
+        http_request: Request HTTP (para negociar la compresión)
         use_case: QueryRAGUseCase inyectado
 
     Returns:
@@ -46,22 +101,62 @@ async def query_rag(
             session_id=request.session_id
         )
 
+        # Comandos especiales sin sesión se resuelven sin pasar por el pipeline
+        static_output = use_case.classify(input_dto)
+        if static_output is not None:
+            return _static_response(static_output, http_request)
+
         # Ejecutar caso de uso
         output_dto = await use_case.execute(input_dto)
 
-        # Convertir Application DTO → HTTP schema
-        return QueryResponse(
-            answer=output_dto.answer,
-            sources=output_dto.sources,
-            document_name=output_dto.document_name,
-            download_url=output_dto.download_url
-        )
+        # Serializar Application DTO → JSON (mismo esquema que QueryResponse)
+        return Response(content=output_dto.to_json(), media_type="application/json")
 
     except Exception as e:
         logger.error(f"Error processing query: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
+@router.post("/query/stream")
+async def query_rag_stream(
+    request: QueryRequest,
+    use_case: Annotated[QueryRAGUseCase, Depends(get_query_rag_use_case)]
+):
+    """
+    Endpoint: Consultar el sistema RAG recibiendo la respuesta a medida que se genera
+
+    Responde en NDJSON (una línea JSON por evento):
+    - {"delta": "..."} por cada fragmento de la respuesta del LLM
+    - Una última línea con el QueryResponse completo (answer, sources, ...)
+    - {"error": "..."} si la generación falla a mitad de la respuesta
+
+    Args:
+        request: QueryRequest con la consulta del usuario (y session_id opcional)
+        use_case: QueryRAGUseCase inyectado
+
+    Returns:
+        StreamingResponse: Eventos NDJSON
+    """
+    input_dto = QueryInput(
+        query=request.query,
+        session_id=request.session_id
+    )
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for item in use_case.execute_stream(input_dto):
+                if isinstance(item, QueryOutput):
+                    yield item.to_json() + b"\n"
+                else:
+                    yield orjson.dumps({"delta": item}) + b"\n"
+        except Exception as e:
+            # Los headers ya se enviaron: el error viaja como último evento
+            logger.error(f"Error streaming query: {e}", exc_info=True)
+            yield orjson.dumps({"error": f"Error processing query: {str(e)}"}) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.get("/stats", response_model=StatisticsResponse)
 async def get_statistics(
     use_case: Annotated[GetStatisticsUseCase, Depends(get_statistics_use_case)]
@@ -86,14 +181,8 @@ async def get_statistics(
         # Ejecutar caso de uso
         output_dto = await use_case.execute()
 
-        # Convertir Application DTO → HTTP schema
-        return StatisticsResponse(
-            total_documents=output_dto.total_documents,
-            total_chunks=output_dto.total_chunks,
-            total_pages=output_dto.total_pages,
-            categories=output_dto.categories,
-            document_types=output_dto.document_types
-        )
+        # Serializar Application DTO → JSON (mismo esquema que StatisticsResponse)
+        return Response(content=output_dto.to_json(), media_type="application/json")
 
     except Exception as e:
         logger.error(f"Error retrieving statistics: {e}", exc_info=True)
@@ -1,24 +1,125 @@
 """
 Session Management API Routes
 """
+import asyncio
+import base64
+import binascii
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Annotated, List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from typing import Annotated, List, Optional, Tuple
+
+import orjson
 
 from presentation.api.schemas import (
     CreateSessionRequest,
     ChatSessionResponse,
-    ChatMessageResponse,
     SessionListResponse,
     DeleteSessionResponse
 )
 from presentation.api.dependencies import get_session_store
-from infrastructure.database.supabase_chat_session_store import SupabaseChatSessionStore
-from core.exceptions import VectorStoreError
+from infrastructure.database.caching_chat_session_store import CachingChatSessionStore
+from core.exceptions import SessionAlreadyExistsError, VectorStoreError
+from domain.entities.chat_session import ChatSession, MAX_SESSION_MESSAGES
+from domain.entities.chat_message import ChatMessage
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
+# Caracteres del último mensaje que se incluyen en el listado de sesiones
+LAST_MESSAGE_PREVIEW_CHARS = 200
+
+
+def _encode_cursor(session: ChatSession) -> str:
+    """Cursor opaco con el (updated_at, session_id) de la última sesión de la página"""
+    payload = orjson.dumps([session.updated_at.isoformat(), session.session_id])
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decodifica un cursor de _encode_cursor (HTTP 400 si no es válido)"""
+    try:
+        updated_at, session_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(updated_at), str(session_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _encode_message_cursor(message: ChatMessage) -> str:
+    """Cursor opaco con el created_at del mensaje más antiguo de la página"""
+    payload = orjson.dumps([message.created_at.isoformat()])
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_message_cursor(cursor: str) -> datetime:
+    """Decodifica un cursor de _encode_message_cursor (HTTP 400 si no es válido)"""
+    try:
+        (created_at,) = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _trim_page(messages: List[ChatMessage], limit: int) -> List[ChatMessage]:
+    """
+    Recorta a limit una página pedida con limit + 1 mensajes (más recientes primero)
+
+    Los mensajes insertados en una misma transacción sin created_at propio
+    (historial anterior) comparten created_at: si el corte cae dentro de
+    ese grupo se excluye entero, porque el cursor
+    (created_at < before) se saltaría los que quedaran fuera. Solo si el
+    grupo ocupa la página completa se corta igualmente.
+    """
+    boundary = messages[limit].created_at
+    end = limit
+    while end > 0 and messages[end - 1].created_at == boundary:
+        end -= 1
+    return messages[:end or limit]
+
+
+def _session_etag(session: ChatSession, page: List[ChatMessage]) -> str:
+    """
+    ETag débil de una página de get_session
+
+    Cambia cuando la sesión se actualiza o cuando la página gana, pierde o
+    sustituye mensajes (el más reciente de la página y su tamaño).
+    """
+    newest = page[0].created_at.timestamp() if page else 0
+    return f'W/"{session.updated_at.timestamp()}-{session.get_message_count()}-{newest}-{len(page)}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match con un ETag (comparación débil, admite listas y '*')"""
+    if not if_none_match:
+        return False
+    weak = etag.removeprefix("W/")
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == weak
+        for candidate in (value.strip() for value in if_none_match.split(","))
+    )
+
+
+def _to_session_summary(session: ChatSession) -> ChatSessionResponse:
+    """Sesión del listado: sin mensajes, con el inicio del último como vista previa"""
+    last = session.get_last_message()
+    return ChatSessionResponse(
+        session_id=session.session_id,
+        user_id=session.user_id,
+        created_at=session.created_at.isoformat(),
+        updated_at=session.updated_at.isoformat(),
+        message_count=session.get_message_count(),
+        messages=[],  # No incluir mensajes en listado
+        last_message_preview=last.content[:LAST_MESSAGE_PREVIEW_CHARS] if last else None,
+        last_message_at=last.created_at.isoformat() if last else None
+    )
+
 
 @router.post(
     "/",
@@ -28,7 +129,7 @@ router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 )
 async def create_session(
     request: CreateSessionRequest,
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)]
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)]
 ):
     """
     Create a new chat session for conversation memory.
@@ -40,20 +141,19 @@ async def create_session(
     try:
         logger.info(f"Creating new session: {request.session_id}")
 
-        # Verificar si ya existe
-        exists = await session_store.session_exists(request.session_id)
-        if exists:
+        # Una sola escritura: el almacén rechaza el ID duplicado de forma atómica
+        try:
+            session = await session_store.create_session(
+                session_id=request.session_id,
+                user_id=request.user_id,
+                metadata=request.metadata
+            )
+        except SessionAlreadyExistsError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Session {request.session_id} already exists"
             )
 
-        session = await session_store.create_session(
-            session_id=request.session_id,
-            user_id=request.user_id,
-            metadata=request.metadata
-        )
-
         return ChatSessionResponse(
             session_id=session.session_id,
             user_id=session.user_id,
@@ -78,17 +178,32 @@ async def create_session(
 )
 async def get_session(
     session_id: str,
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)]
+    request: Request,
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SESSION_MESSAGES)] = 50,
+    before: Optional[str] = None
 ):
     """
-    Retrieve a chat session with its complete message history.
+    Retrieve a chat session with one page of its message history.
 
     - **session_id**: The session identifier
+    - **limit**: Maximum number of messages to return, most recent first (default: 50)
+    - **before**: `next_cursor` of the previous response, to get older messages (optional)
+
+    Responds with an `ETag`; a request whose `If-None-Match` matches it gets
+    `304 Not Modified` without a body.
     """
     try:
-        logger.info(f"Fetching session: {session_id}")
+        logger.info(f"Fetching session: {session_id} (limit={limit}, before={before})")
 
-        session = await session_store.get_session(session_id)
+        before_at = _decode_message_cursor(before) if before else None
+
+        # Solo los datos de la sesión (sin historial) y, en paralelo, la página
+        # pedida con un mensaje de más para saber si quedan otros más antiguos
+        session, page = await asyncio.gather(
+            session_store.get_session_summary(session_id),
+            session_store.get_messages_page(session_id, limit=limit + 1, before=before_at)
+        )
 
         if not session:
             raise HTTPException(
@@ -96,22 +211,37 @@ async def get_session(
                 detail=f"Session {session_id} not found"
             )
 
-        return ChatSessionResponse(
-            session_id=session.session_id,
-            user_id=session.user_id,
-            created_at=session.created_at.isoformat(),
-            updated_at=session.updated_at.isoformat(),
-            message_count=session.get_message_count(),
-            messages=[
-                ChatMessageResponse(
-                    role=msg.role,
-                    content=msg.content,
-                    created_at=msg.created_at.isoformat(),
-                    metadata=msg.metadata
-                )
-                for msg in session.messages
-            ]
-        )
+        next_cursor = None
+        if len(page) > limit:
+            page = _trim_page(page, limit)
+            next_cursor = _encode_message_cursor(page[-1])
+
+        # Sin cambios desde la copia del cliente: ni se serializa ni se envía el historial
+        etag = _session_etag(session, page)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        # Respuesta ya serializada: FastAPI no valida contra response_model
+        # (que se mantiene para la documentación) los cientos de mensajes de
+        # una sesión larga; orjson escribe los datetime en ISO 8601 directamente
+        return ORJSONResponse({
+            "session_id": session.session_id,
+            "user_id": session.user_id,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "message_count": session.get_message_count(),
+            "messages": [
+                {
+                    "role": msg.role,
+                    "content": msg.content,
+                    "created_at": msg.created_at,
+                    "metadata": msg.metadata
+                }
+                # Orden cronológico dentro de la página
+                for msg in reversed(page)
+            ],
+            "next_cursor": next_cursor
+        }, headers={"ETag": etag})
 
     except VectorStoreError as e:
         logger.error(f"Error fetching session: {e}")
@@ -129,35 +259,30 @@ async def get_session(
 async def list_sessions(
     user_id: str = None,
     limit: int = 50,
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)] = None
+    cursor: Optional[str] = None,
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)] = None
 ):
     """
     List all chat sessions, optionally filtered by user_id.
 
     - **user_id**: Filter by user (optional)
     - **limit**: Maximum number of sessions to return (default: 50)
+    - **cursor**: `next_cursor` of the previous page, to get the next one (optional)
     """
     try:
-        logger.info(f"Listing sessions (user_id={user_id}, limit={limit})")
+        logger.info(f"Listing sessions (user_id={user_id}, limit={limit}, cursor={cursor})")
 
         sessions = await session_store.get_all_sessions(
             user_id=user_id,
-            limit=limit
+            limit=limit,
+            before=_decode_cursor(cursor) if cursor else None
         )
 
         return SessionListResponse(
-            sessions=[
-                ChatSessionResponse(
-                    session_id=session.session_id,
-                    user_id=session.user_id,
-                    created_at=session.created_at.isoformat(),
-                    updated_at=session.updated_at.isoformat(),
-                    message_count=session.get_message_count(),
-                    messages=[]  # No incluir mensajes en listado
-                )
-                for session in sessions
-            ],
-            total=len(sessions)
+            sessions=[_to_session_summary(session) for session in sessions],
+            total=len(sessions),
+            # Página completa: puede haber más sesiones después de la última
+            next_cursor=_encode_cursor(sessions[-1]) if sessions and len(sessions) == limit else None
         )
 
     except VectorStoreError as e:
@@ -175,7 +300,7 @@ async def list_sessions(
 )
 async def delete_session(
     session_id: str,
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)]
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)]
 ):
     """
     Delete a chat session and all its messages.
@@ -214,7 +339,7 @@ async def delete_session(
 )
 async def clear_session_history(
     session_id: str,
-    session_store: Annotated[SupabaseChatSessionStore, Depends(get_session_store)]
+    session_store: Annotated[CachingChatSessionStore, Depends(get_session_store)]
 ):
     """
     Clear all messages from a session without deleting the session itself.
@@ -4,11 +4,18 @@ Pydantic schemas for HTTP API (Request/Response models)
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 
+from application.dtos.query_dto import MAX_QUERY_LENGTH
+
 
 # Query Schemas
 class QueryRequest(BaseModel):
     """Request schema for RAG queries with session support"""
-    query: str = Field(..., min_length=1, description="User's question")
+    query: str = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_QUERY_LENGTH,
+        description="User's question"
+    )
     session_id: Optional[str] = Field(None, description="Session ID for conversation memory")
 
     model_config = {
@@ -112,12 +119,16 @@ class ChatSessionResponse(BaseModel):
     updated_at: str = Field(..., description="Last update timestamp")
     message_count: int = Field(..., description="Number of messages in session")
     messages: List[ChatMessageResponse] = Field(default_factory=list, description="Session messages")
+    last_message_preview: Optional[str] = Field(None, description="Start of the most recent message (session listing only)")
+    last_message_at: Optional[str] = Field(None, description="Timestamp of the most recent message (session listing only)")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the previous page of messages (null when there are no older messages)")
 
 
 class SessionListResponse(BaseModel):
     """Response schema for list of sessions"""
     sessions: List[ChatSessionResponse] = Field(..., description="List of chat sessions")
     total: int = Field(..., description="Total number of sessions")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (null on the last page)")
 
 
 class DeleteSessionResponse(BaseModel):
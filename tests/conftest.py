@@ -11,6 +11,7 @@ from domain.entities.document import Document
 from domain.entities.chunk import DocumentChunk
 from domain.entities.chat_message import ChatMessage
 from domain.entities.chat_session import ChatSession
+from domain.entities.query_result import SimilarChunk
 
 # Import DTOs
 from application.dtos.query_dto import QueryInput, QueryOutput
@@ -188,20 +189,22 @@ def mock_vector_store():
     """Mock del vector store"""
     mock = AsyncMock()
     mock.search_similar_chunks.return_value = [
-        {
-            'chunk_id': 'chunk-001',
-            'chunk_text': 'Requisitos: DNI, RUC, croquis del local.',
-            'filename': 'Licencia_Funcionamiento.pdf',
-            'page_number': 1,
-            'similarity_score': 0.85
-        },
-        {
-            'chunk_id': 'chunk-002',
-            'chunk_text': 'El costo es de S/. 50.00 para bodegas.',
-            'filename': 'Tarifario_Municipal.pdf',
-            'page_number': 3,
-            'similarity_score': 0.78
-        }
+        SimilarChunk(
+            text='Requisitos: DNI, RUC, croquis del local.',
+            document_name='Licencia_Funcionamiento.pdf',
+            document_id='doc-001',
+            page_number=1,
+            similarity_score=0.85,
+            chunk_id='chunk-001'
+        ),
+        SimilarChunk(
+            text='El costo es de S/. 50.00 para bodegas.',
+            document_name='Tarifario_Municipal.pdf',
+            document_id='doc-002',
+            page_number=3,
+            similarity_score=0.78,
+            chunk_id='chunk-002'
+        )
     ]
     mock.get_statistics.return_value = {
         'total_documents': 10,
@@ -228,6 +231,7 @@ def mock_session_store():
     mock.create_session.return_value = None
     mock.get_messages.return_value = []
     mock.add_message.return_value = None
+    mock.add_messages.return_value = None
     return mock
 
 
@@ -263,28 +267,31 @@ def sample_conversation_history() -> List[ChatMessage]:
 
 
 @pytest.fixture
-def sample_similar_chunks() -> List[dict]:
+def sample_similar_chunks() -> List[SimilarChunk]:
     """Fixture: Lista de chunks similares (resultado de búsqueda vectorial)"""
     return [
-        {
-            'chunk_id': 'chunk-001',
-            'chunk_text': 'Requisitos para licencia: DNI original y copia, RUC, croquis del local.',
-            'filename': 'Licencia_Funcionamiento.pdf',
-            'page_number': 1,
-            'similarity_score': 0.92
-        },
-        {
-            'chunk_id': 'chunk-002',
-            'chunk_text': 'Costos: S/. 50.00 para bodegas, S/. 150.00 para restaurantes.',
-            'filename': 'Tarifario_Municipal.pdf',
-            'page_number': 3,
-            'similarity_score': 0.85
-        },
-        {
-            'chunk_id': 'chunk-003',
-            'chunk_text': 'Plazo de atención: 1 día hábil para licencias automáticas.',
-            'filename': 'Procedimientos_TUPA.pdf',
-            'page_number': 5,
-            'similarity_score': 0.78
-        }
+        SimilarChunk(
+            text='Requisitos para licencia: DNI original y copia, RUC, croquis del local.',
+            document_name='Licencia_Funcionamiento.pdf',
+            document_id='doc-001',
+            page_number=1,
+            similarity_score=0.92,
+            chunk_id='chunk-001'
+        ),
+        SimilarChunk(
+            text='Costos: S/. 50.00 para bodegas, S/. 150.00 para restaurantes.',
+            document_name='Tarifario_Municipal.pdf',
+            document_id='doc-002',
+            page_number=3,
+            similarity_score=0.85,
+            chunk_id='chunk-002'
+        ),
+        SimilarChunk(
+            text='Plazo de atención: 1 día hábil para licencias automáticas.',
+            document_name='Procedimientos_TUPA.pdf',
+            document_id='doc-003',
+            page_number=5,
+            similarity_score=0.78,
+            chunk_id='chunk-003'
+        )
     ]
@@ -0,0 +1,3 @@
+"""
+Tests para caches de la capa de aplicación
+"""
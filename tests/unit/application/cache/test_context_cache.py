@@ -0,0 +1,74 @@
+"""
+Tests para ContextCache
+"""
+import pytest
+from application.cache.context_cache import ContextCache
+from domain.entities.query_result import SimilarChunk
+
+
+def _chunk(text: str, chunk_id: str = None) -> SimilarChunk:
+    """Crea un SimilarChunk mínimo para los tests"""
+    return SimilarChunk(
+        text=text,
+        document_name="doc.pdf",
+        document_id="doc-1",
+        page_number=1,
+        similarity_score=0.9,
+        chunk_id=chunk_id
+    )
+
+
+class TestContextCache:
+    """Tests para ContextCache"""
+
+    def test_key_uses_chunk_ids(self):
+        """Prueba que la clave usa el id de cada chunk"""
+        chunks = [_chunk('x', 'a'), _chunk('y', 'b')]
+
+        assert ContextCache.key_for(chunks) == ('a', 'b')
+
+    def test_key_without_ids(self):
+        """Prueba la clave de chunks sin id"""
+        chunks = [_chunk('texto')]
+
+        assert ContextCache.key_for(chunks) == (('doc.pdf', 'texto'),)
+
+    def test_key_depends_on_order(self):
+        """Prueba que el orden de los chunks forma parte de la clave"""
+        first = ContextCache.key_for([_chunk('x', 'a'), _chunk('y', 'b')])
+        second = ContextCache.key_for([_chunk('y', 'b'), _chunk('x', 'a')])
+
+        assert first != second
+
+    def test_get_and_put(self):
+        """Prueba guardar y recuperar un contexto"""
+        cache = ContextCache()
+
+        assert cache.get(('a',)) is None
+        cache.put(('a',), "contexto")
+        assert cache.get(('a',)) == "contexto"
+
+    def test_lru_eviction(self):
+        """Prueba que se desaloja el contexto menos usado"""
+        cache = ContextCache(max_entries=2)
+        cache.put(('a',), "A")
+        cache.put(('b',), "B")
+        cache.get(('a',))
+        cache.put(('c',), "C")
+
+        assert len(cache) == 2
+        assert cache.get(('b',)) is None
+        assert cache.get(('a',)) == "A"
+
+    def test_clear(self):
+        """Prueba vaciar el cache"""
+        cache = ContextCache()
+        cache.put(('a',), "A")
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_invalid_max_entries(self):
+        """Prueba que max_entries debe ser positivo"""
+        with pytest.raises(ValueError):
+            ContextCache(max_entries=0)
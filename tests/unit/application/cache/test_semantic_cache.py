@@ -0,0 +1,146 @@
+"""
+Tests para SemanticCache
+"""
+import numpy as np
+import pytest
+from application.cache.semantic_cache import SemanticCache
+from application.dtos.query_dto import QueryOutput
+
+
+@pytest.fixture
+def output() -> QueryOutput:
+    """Fixture: Respuesta RAG a cachear"""
+    return QueryOutput(
+        answer="<p>Respuesta</p>",
+        sources=["doc1.pdf"],
+        document_name="doc1.pdf"
+    )
+
+
+class TestSemanticCache:
+    """Tests para SemanticCache"""
+
+    def test_get_exact_miss(self):
+        """Prueba búsqueda exacta sin entradas"""
+        cache = SemanticCache()
+
+        assert cache.get_exact("consulta") is None
+
+    def test_get_exact_hit(self, output):
+        """Prueba búsqueda exacta con entrada cacheada"""
+        cache = SemanticCache()
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        cached = cache.get_exact("consulta")
+
+        assert cached == output
+        assert cached is not output
+
+    def test_cached_output_is_isolated(self, output):
+        """Prueba que modificar la respuesta devuelta no altera el cache"""
+        cache = SemanticCache()
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        cache.get_exact("consulta").sources.append("otro.pdf")
+
+        assert cache.get_exact("consulta").sources == ["doc1.pdf"]
+
+    def test_get_similar_hit(self, output):
+        """Prueba búsqueda semántica por encima del umbral"""
+        cache = SemanticCache(similarity_threshold=0.95)
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        assert cache.get_similar([0.99, 0.05, 0.0]) == output
+
+    def test_get_similar_miss_below_threshold(self, output):
+        """Prueba búsqueda semántica por debajo del umbral"""
+        cache = SemanticCache(similarity_threshold=0.95)
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        assert cache.get_similar([0.0, 1.0, 0.0]) is None
+
+    def test_get_similar_quantized_precision(self, output):
+        """Prueba que la cuantización int8 conserva la similitud coseno"""
+        rng = np.random.default_rng(0)
+        stored = rng.standard_normal(768)
+        nearby = stored + 0.1 * rng.standard_normal(768)
+        cosine = float(stored @ nearby / (np.linalg.norm(stored) * np.linalg.norm(nearby)))
+
+        cache = SemanticCache(similarity_threshold=cosine - 0.005)
+        cache.put("consulta", stored.tolist(), output)
+        assert cache.get_similar(nearby.tolist()) == output
+
+        cache = SemanticCache(similarity_threshold=cosine + 0.005)
+        cache.put("consulta", stored.tolist(), output)
+        assert cache.get_similar(nearby.tolist()) is None
+
+    def test_get_similar_dimension_mismatch(self, output):
+        """Prueba búsqueda semántica con dimensión distinta"""
+        cache = SemanticCache()
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        assert cache.get_similar([1.0, 0.0]) is None
+
+    def test_put_ignores_zero_vector(self, output):
+        """Prueba que un embedding nulo no se cachea"""
+        cache = SemanticCache()
+        cache.put("consulta", [0.0, 0.0, 0.0], output)
+
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self, output):
+        """Prueba desalojo LRU al superar la capacidad"""
+        cache = SemanticCache(max_entries=2)
+        cache.put("a", [1.0, 0.0, 0.0], output)
+        cache.put("b", [0.0, 1.0, 0.0], output)
+        cache.get_exact("a")
+        cache.put("c", [0.0, 0.0, 1.0], output)
+
+        assert len(cache) == 2
+        assert cache.get_exact("a") is not None
+        assert cache.get_exact("b") is None
+        assert cache.get_similar([0.0, 1.0, 0.0]) is None
+        assert cache.get_similar([0.0, 0.0, 1.0]) is not None
+
+    def test_entries_expire_after_ttl(self, output, monkeypatch):
+        """Prueba que las respuestas caducan tras ttl_seconds"""
+        now = [1000.0]
+        monkeypatch.setattr("application.cache.semantic_cache.time.monotonic", lambda: now[0])
+        cache = SemanticCache(ttl_seconds=60)
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        now[0] += 59
+        assert cache.get_exact("consulta") is not None
+        assert cache.get_similar([1.0, 0.0, 0.0]) is not None
+
+        now[0] += 2
+        assert cache.get_exact("consulta") is None
+        assert cache.get_similar([1.0, 0.0, 0.0]) is None
+
+    def test_put_refreshes_expired_entry(self, output, monkeypatch):
+        """Prueba que volver a cachear una respuesta caducada la renueva"""
+        now = [1000.0]
+        monkeypatch.setattr("application.cache.semantic_cache.time.monotonic", lambda: now[0])
+        cache = SemanticCache(ttl_seconds=60)
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        now[0] += 120
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        assert len(cache) == 1
+        assert cache.get_exact("consulta") == output
+
+    def test_clear(self, output):
+        """Prueba vaciar el cache"""
+        cache = SemanticCache()
+        cache.put("consulta", [1.0, 0.0, 0.0], output)
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.get_similar([1.0, 0.0, 0.0]) is None
+
+    def test_invalid_max_entries(self):
+        """Prueba capacidad inválida"""
+        with pytest.raises(ValueError):
+            SemanticCache(max_entries=0)
@@ -1,8 +1,9 @@
 """
 Tests para Query DTOs
 """
+import json
 import pytest
-from application.dtos.query_dto import QueryInput, QueryOutput
+from application.dtos.query_dto import MAX_QUERY_LENGTH, QueryInput, QueryOutput
 
 
 class TestQueryInput:
@@ -45,6 +46,33 @@ class TestQueryInput:
         query_input = QueryInput(query=None)
         assert query_input.is_valid() is False
 
+    def test_is_valid_max_length(self):
+        """Prueba is_valid en el límite de longitud"""
+        assert QueryInput(query="a" * MAX_QUERY_LENGTH).is_valid() is True
+        assert QueryInput(query="a" * (MAX_QUERY_LENGTH + 1)).is_valid() is False
+
+    def test_normalized_query(self):
+        """Prueba normalización de la query"""
+        query_input = QueryInput(query="  ¿Cuánto CUESTA?  ")
+        assert query_input.normalized_query == "¿cuánto cuesta?"
+
+    def test_normalized_query_unicode_forms(self):
+        """Prueba que formas Unicode equivalentes se normalizan igual"""
+        composed = QueryInput(query="qu\u00e9 temas")
+        decomposed = QueryInput(query="que\u0301 temas")
+        assert composed.normalized_query == decomposed.normalized_query
+
+    def test_normalized_query_is_cached(self):
+        """Prueba que la normalización se calcula una sola vez"""
+        query_input = QueryInput(query="Pregunta")
+        assert query_input.normalized_query is query_input.normalized_query
+
+    def test_normalized_query_not_in_equality(self):
+        """Prueba que el cache interno no afecta la igualdad"""
+        query_input = QueryInput(query="Pregunta")
+        query_input.normalized_query
+        assert query_input == QueryInput(query="Pregunta")
+
     @pytest.mark.parametrize("query,expected", [
         ("Pregunta válida", True),
         ("¿Cómo?", True),
@@ -123,6 +151,19 @@ class TestQueryOutput:
             "download_url": None
         }
 
+    def test_to_json_matches_to_dict(self):
+        """Prueba que to_json serializa los mismos campos que to_dict"""
+        output = QueryOutput(
+            answer="<p>Licencia de funcionamiento</p>",
+            sources=["doc1.pdf", "doc2.pdf"],
+            document_name="doc1.pdf"
+        )
+
+        result = output.to_json()
+
+        assert isinstance(result, bytes)
+        assert json.loads(result) == output.to_dict()
+
     def test_to_dict_multiple_sources(self):
         """Prueba conversión a diccionario con múltiples fuentes"""
         output = QueryOutput(
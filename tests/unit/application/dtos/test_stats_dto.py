@@ -1,6 +1,7 @@
 """
 Tests para Stats DTOs
 """
+import json
 import pytest
 from application.dtos.stats_dto import StatsOutput
 
@@ -60,6 +61,21 @@ class TestStatsOutput:
             "document_types": {"ley": 25, "decreto": 25}
         }
 
+    def test_to_json_matches_to_dict(self):
+        """Prueba que to_json serializa los mismos campos que to_dict"""
+        stats = StatsOutput(
+            total_documents=50,
+            total_chunks=200,
+            total_pages=300,
+            categories={"legal": 30, "administrativo": 20},
+            document_types={"ley": 25}
+        )
+
+        result = stats.to_json()
+
+        assert isinstance(result, bytes)
+        assert json.loads(result) == stats.to_dict()
+
     def test_to_dict_preserves_structure(self):
         """Prueba que to_dict preserva la estructura exacta"""
         stats = StatsOutput(
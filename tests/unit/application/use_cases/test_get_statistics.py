@@ -1,6 +1,7 @@
 """
 Unit tests for GetStatisticsUseCase
 """
+import asyncio
 import pytest
 from unittest.mock import AsyncMock
 
@@ -228,3 +229,72 @@ class TestGetStatisticsUseCaseEdgeCases:
 
         with pytest.raises(ConnectionError, match="Cannot connect to database"):
             await use_case.execute()
+
+
+class TestGetStatisticsUseCaseCache:
+    """Tests del cache TTL de estadísticas"""
+
+    @pytest.fixture
+    def stats_data(self):
+        """Fixture: Estadísticas devueltas por el vector store"""
+        return {
+            'total_documents': 3,
+            'total_chunks': 30,
+            'total_pages': 12,
+            'categories': {'comercio': 3},
+            'document_types': {'guia': 3}
+        }
+
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl(self, mock_vector_store, stats_data, monkeypatch):
+        """Test: Dentro del TTL no se vuelve a consultar el vector store"""
+        now = [1000.0]
+        monkeypatch.setattr("application.use_cases.get_statistics.time.monotonic", lambda: now[0])
+        mock_vector_store.get_statistics.return_value = stats_data
+        use_case = GetStatisticsUseCase(vector_store=mock_vector_store, cache_ttl_seconds=60)
+
+        first = await use_case.execute()
+        now[0] += 59
+        second = await use_case.execute()
+
+        assert first == second
+        assert mock_vector_store.get_statistics.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refreshed_after_ttl(self, mock_vector_store, stats_data, monkeypatch):
+        """Test: Tras el TTL las estadísticas se vuelven a consultar"""
+        now = [1000.0]
+        monkeypatch.setattr("application.use_cases.get_statistics.time.monotonic", lambda: now[0])
+        mock_vector_store.get_statistics.return_value = stats_data
+        use_case = GetStatisticsUseCase(vector_store=mock_vector_store, cache_ttl_seconds=60)
+
+        await use_case.execute()
+        now[0] += 61
+        await use_case.execute()
+
+        assert mock_vector_store.get_statistics.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_output_is_isolated(self, mock_vector_store, stats_data):
+        """Test: Modificar el resultado devuelto no altera el cache"""
+        mock_vector_store.get_statistics.return_value = stats_data
+        use_case = GetStatisticsUseCase(vector_store=mock_vector_store, cache_ttl_seconds=60)
+
+        (await use_case.execute()).categories['otra'] = 1
+
+        assert (await use_case.execute()).categories == {'comercio': 3}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_query(self, mock_vector_store, stats_data):
+        """Test: Peticiones concurrentes con el cache vacío hacen una sola consulta"""
+        async def slow_statistics():
+            await asyncio.sleep(0.01)
+            return stats_data
+
+        mock_vector_store.get_statistics.side_effect = slow_statistics
+        use_case = GetStatisticsUseCase(vector_store=mock_vector_store, cache_ttl_seconds=60)
+
+        results = await asyncio.gather(*(use_case.execute() for _ in range(5)))
+
+        assert all(result.total_documents == 3 for result in results)
+        assert mock_vector_store.get_statistics.call_count == 1
@@ -7,7 +7,24 @@ from datetime import datetime
 
 from application.use_cases.query_rag import QueryRAGUseCase
 from application.dtos.query_dto import QueryInput, QueryOutput
+from application.cache.semantic_cache import SemanticCache
+from application.cache.context_cache import ContextCache
+from core.exceptions import SessionAlreadyExistsError
+from infrastructure.database.caching_chat_session_store import CachingChatSessionStore
 from domain.entities.chat_message import ChatMessage
+from domain.entities.query_result import SimilarChunk
+
+
+def _chunk(chunk_id: str, text: str, filename: str, score: float) -> SimilarChunk:
+    """Crea un SimilarChunk mínimo para los tests"""
+    return SimilarChunk(
+        text=text,
+        document_name=filename,
+        document_id='doc-1',
+        page_number=1,
+        similarity_score=score,
+        chunk_id=chunk_id
+    )
 
 
 class TestQueryRAGUseCase:
@@ -91,8 +108,9 @@ class TestQueryRAGUseCase:
         mock_session_store.session_exists.assert_called_with("session-abc-123")
         mock_session_store.get_messages.assert_called_once()
 
-        # Verificar que se guardaron los mensajes
-        assert mock_session_store.add_message.call_count == 2  # user + assistant
+        # Verificar que se guardaron los mensajes en una sola escritura
+        mock_session_store.add_messages.assert_called_once()
+        assert len(mock_session_store.add_messages.call_args[0][1]) == 2  # user + assistant
 
         # Verificar que se pasó historial al LLM
         call_args = mock_chat_service.generate_answer.call_args
@@ -101,6 +119,34 @@ class TestQueryRAGUseCase:
 
         assert isinstance(result, QueryOutput)
 
+    @pytest.mark.asyncio
+    async def test_execute_query_with_caching_session_store(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        mock_chat_service,
+        mock_session_store,
+        sample_query_input,
+        sample_conversation_history
+    ):
+        """Test: Con el store de producción (cache vacío) se carga el historial y se guarda el turno"""
+        mock_session_store.get_messages.return_value = sample_conversation_history
+        semantic_cache = SemanticCache(max_entries=10, similarity_threshold=0.9)
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=mock_chat_service,
+            session_store=CachingChatSessionStore(mock_session_store),
+            semantic_cache=semantic_cache
+        )
+
+        await use_case.execute(sample_query_input)
+
+        mock_session_store.get_messages.assert_called_once()
+        mock_session_store.add_messages.assert_called_once()
+        # Con historial la respuesta no se guarda en el cache semántico
+        assert len(semantic_cache) == 0
+
     @pytest.mark.asyncio
     async def test_execute_query_creates_new_session_if_not_exists(
         self,
@@ -175,6 +221,37 @@ class TestQueryRAGUseCase:
         assert "De qué trata este sistema RAG" in result.answer
         assert result.document_name == "Guía Técnica RAG"
 
+    @pytest.mark.asyncio
+    async def test_special_command_skips_history_and_embedding(
+        self,
+        use_case,
+        mock_session_store,
+        mock_embedding_service
+    ):
+        """Test: Un comando especial no carga historial ni genera embedding"""
+        query_input = QueryInput(query="ayuda", session_id="session-123")
+
+        await use_case.execute(query_input)
+
+        mock_session_store.get_messages.assert_not_called()
+        mock_embedding_service.generate_query_embedding.assert_not_called()
+        mock_session_store.add_messages.assert_called_once()
+
+    def test_classify_special_command_without_session(self, use_case):
+        """Test: classify resuelve comandos especiales sin sesión"""
+        result = use_case.classify(QueryInput(query="ayuda"))
+
+        assert result is not None
+        assert result.document_name == "Sistema de Ayuda"
+
+    def test_classify_defers_when_session(self, use_case):
+        """Test: Con sesión, classify delega en execute para guardar la interacción"""
+        assert use_case.classify(QueryInput(query="ayuda", session_id="s-1")) is None
+
+    def test_classify_regular_query(self, use_case):
+        """Test: Una consulta normal no se resuelve en classify"""
+        assert use_case.classify(QueryInput(query="¿Cuánto cuesta la licencia?")) is None
+
     @pytest.mark.asyncio
     async def test_build_context_from_chunks(
         self,
@@ -189,6 +266,28 @@ class TestQueryRAGUseCase:
         assert "Licencia_Funcionamiento.pdf" in context
         assert "Requisitos" in context
 
+    def test_build_context_reuses_cached_context(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        mock_chat_service,
+        sample_similar_chunks
+    ):
+        """Test: El contexto de un mismo conjunto de chunks se reutiliza"""
+        context_cache = ContextCache()
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=mock_chat_service,
+            context_cache=context_cache
+        )
+
+        first = use_case._build_context(sample_similar_chunks)
+        second = use_case._build_context(sample_similar_chunks)
+
+        assert second is first
+        assert len(context_cache) == 1
+
     @pytest.mark.asyncio
     async def test_handle_special_commands_none(self, use_case):
         """Test: Query normal no es comando especial"""
@@ -197,6 +296,19 @@ class TestQueryRAGUseCase:
         )
         assert result is None
 
+    @pytest.mark.parametrize("query,expected_document", [
+        ("que temas disponibles hay", "Temas Disponibles"),
+        ("ayuda con faq", "Preguntas Frecuentes"),
+        ("necesito ayuda con el RAG", "Guía Técnica RAG"),
+        ("MENU", "Sistema de Ayuda"),
+    ])
+    def test_handle_special_commands_priority(self, use_case, query, expected_document):
+        """Test: La categoría de mayor prioridad gana aunque coincidan varias"""
+        result = use_case._handle_special_commands(QueryInput(query=query).normalized_query)
+
+        assert result is not None
+        assert result.document_name == expected_document
+
     @pytest.mark.asyncio
     async def test_load_conversation_history_session_exists(
         self,
@@ -227,6 +339,23 @@ class TestQueryRAGUseCase:
         assert len(history) == 0
         mock_session_store.create_session.assert_called_once_with("session-new")
 
+    @pytest.mark.asyncio
+    async def test_load_conversation_history_session_created_concurrently(
+        self,
+        use_case,
+        mock_session_store,
+        caplog
+    ):
+        """Test: Si otra petición crea la sesión a la vez, se sigue sin historial y sin error"""
+        mock_session_store.session_exists.return_value = False
+        mock_session_store.create_session.side_effect = SessionAlreadyExistsError()
+
+        with caplog.at_level("ERROR"):
+            history = await use_case._load_conversation_history("session-race")
+
+        assert history == []
+        assert not caplog.records
+
     @pytest.mark.asyncio
     async def test_load_conversation_history_error_handling(
         self,
@@ -257,15 +386,13 @@ class TestQueryRAGUseCase:
             sources=["doc.pdf"]
         )
 
-        # Verificar que se guardaron ambos mensajes (user + assistant)
-        assert mock_session_store.add_message.call_count == 2
+        # Verificar que se guardaron ambos mensajes (user + assistant) en un solo lote
+        mock_session_store.add_messages.assert_called_once()
+        session_id, messages = mock_session_store.add_messages.call_args[0]
+        assert session_id == "session-123"
+        assert len(messages) == 2
 
-        # Verificar contenido de los mensajes
-        user_msg_call = mock_session_store.add_message.call_args_list[0]
-        assistant_msg_call = mock_session_store.add_message.call_args_list[1]
-
-        user_msg = user_msg_call[0][1]
-        assistant_msg = assistant_msg_call[0][1]
+        user_msg, assistant_msg = messages
 
         assert user_msg.role == 'user'
         assert user_msg.content == "¿Cuánto cuesta?"
@@ -274,6 +401,9 @@ class TestQueryRAGUseCase:
         assert assistant_msg.content == "El costo es S/. 50.00"
         assert assistant_msg.metadata['sources'] == ["doc.pdf"]
 
+        # La respuesta se ordena siempre después de la pregunta
+        assert assistant_msg.created_at > user_msg.created_at
+
     @pytest.mark.asyncio
     async def test_save_interaction_creates_session_if_not_exists(
         self,
@@ -292,6 +422,25 @@ class TestQueryRAGUseCase:
 
         mock_session_store.create_session.assert_called_once_with("session-new")
 
+    @pytest.mark.asyncio
+    async def test_save_interaction_session_created_concurrently(
+        self,
+        use_case,
+        mock_session_store
+    ):
+        """Test: Si otra petición crea la sesión a la vez, los mensajes se guardan igual"""
+        mock_session_store.session_exists.return_value = False
+        mock_session_store.create_session.side_effect = SessionAlreadyExistsError()
+
+        await use_case._save_interaction(
+            session_id="session-race",
+            user_query="Test",
+            assistant_answer="Answer",
+            sources=[]
+        )
+
+        mock_session_store.add_messages.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_save_interaction_error_handling(
         self,
@@ -299,7 +448,7 @@ class TestQueryRAGUseCase:
         mock_session_store
     ):
         """Test: Error al guardar interacción no detiene el flujo"""
-        mock_session_store.add_message.side_effect = Exception("Save error")
+        mock_session_store.add_messages.side_effect = Exception("Save error")
 
         # No debería lanzar excepción
         await use_case._save_interaction(
@@ -319,9 +468,9 @@ class TestQueryRAGUseCase:
         """Test: Extracción de fuentes únicas"""
         # Configurar chunks con fuentes duplicadas
         mock_vector_store.search_similar_chunks.return_value = [
-            {'chunk_id': '1', 'chunk_text': 'Text 1', 'filename': 'doc1.pdf', 'similarity_score': 0.9},
-            {'chunk_id': '2', 'chunk_text': 'Text 2', 'filename': 'doc1.pdf', 'similarity_score': 0.85},
-            {'chunk_id': '3', 'chunk_text': 'Text 3', 'filename': 'doc2.pdf', 'similarity_score': 0.8},
+            _chunk('1', 'Text 1', 'doc1.pdf', 0.9),
+            _chunk('2', 'Text 2', 'doc1.pdf', 0.85),
+            _chunk('3', 'Text 3', 'doc2.pdf', 0.8),
         ]
 
         result = await use_case.execute(sample_query_input_no_session)
@@ -330,6 +479,26 @@ class TestQueryRAGUseCase:
         assert len(result.sources) == 2
         assert set(result.sources) == {'doc1.pdf', 'doc2.pdf'}
 
+    @pytest.mark.asyncio
+    async def test_execute_sources_keep_retrieval_order(
+        self,
+        use_case,
+        sample_query_input_no_session,
+        mock_vector_store
+    ):
+        """Test: Las fuentes conservan el orden de relevancia y omiten vacías"""
+        mock_vector_store.search_similar_chunks.return_value = [
+            _chunk('1', 'Text 1', 'doc2.pdf', 0.9),
+            _chunk('2', 'Text 2', '', 0.85),
+            _chunk('3', 'Text 3', 'doc1.pdf', 0.8),
+            _chunk('4', 'Text 4', 'doc2.pdf', 0.7),
+        ]
+
+        result = await use_case.execute(sample_query_input_no_session)
+
+        assert result.sources == ['doc2.pdf', 'doc1.pdf']
+        assert result.document_name == 'doc2.pdf'
+
     @pytest.mark.asyncio
     async def test_execute_passes_correct_parameters_to_vector_store(
         self,
@@ -495,3 +664,165 @@ class TestQueryRAGUseCaseEdgeCases:
 
         with pytest.raises(Exception, match="LLM timeout"):
             await use_case.execute(query_input)
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_exact_hit_skips_pipeline(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        mock_chat_service
+    ):
+        """Test: Una query repetida se responde desde el cache"""
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=mock_chat_service,
+            semantic_cache=SemanticCache()
+        )
+
+        first = await use_case.execute(QueryInput(query="¿Cuánto cuesta una licencia?"))
+        second = await use_case.execute(QueryInput(query="  ¿CUÁNTO cuesta una licencia?"))
+
+        assert second == first
+        mock_embedding_service.generate_query_embedding.assert_called_once()
+        mock_chat_service.generate_answer.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_similar_hit_skips_search_and_llm(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        mock_chat_service
+    ):
+        """Test: Una query parecida reutiliza la respuesta tras el embedding"""
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=mock_chat_service,
+            semantic_cache=SemanticCache()
+        )
+
+        await use_case.execute(QueryInput(query="¿Cuánto cuesta una licencia?"))
+        await use_case.execute(QueryInput(query="¿Cuál es el costo de una licencia?"))
+
+        assert mock_embedding_service.generate_query_embedding.call_count == 2
+        mock_vector_store.search_similar_chunks.assert_called_once()
+        mock_chat_service.generate_answer.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_skipped_with_history(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        mock_chat_service,
+        mock_session_store,
+        sample_conversation_history
+    ):
+        """Test: Con historial de conversación no se usa el cache"""
+        mock_session_store.get_messages.return_value = sample_conversation_history
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=mock_chat_service,
+            session_store=mock_session_store,
+            semantic_cache=SemanticCache()
+        )
+
+        query_input = QueryInput(query="¿Y cuánto demora?", session_id="session-123")
+        await use_case.execute(query_input)
+        await use_case.execute(query_input)
+
+        assert mock_chat_service.generate_answer.call_count == 2
+
+
+class TestQueryRAGUseCaseStream:
+    """Tests para execute_stream"""
+
+    @pytest.fixture
+    def streaming_chat_service(self, mock_chat_service):
+        """Fixture: Servicio de chat que emite la respuesta en fragmentos"""
+        async def stream_answer(**kwargs):
+            for part in ("<p>Para obtener ", "una licencia</p>"):
+                yield part
+
+        mock_chat_service.stream_answer = Mock(side_effect=stream_answer)
+        return mock_chat_service
+
+    @staticmethod
+    async def _collect(use_case, query_input):
+        return [item async for item in use_case.execute_stream(query_input)]
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_parts_then_output(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        streaming_chat_service,
+        mock_session_store
+    ):
+        """Test: Emite los fragmentos y al final el QueryOutput completo"""
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=streaming_chat_service,
+            session_store=mock_session_store
+        )
+
+        items = await self._collect(
+            use_case,
+            QueryInput(query="¿Cómo obtengo una licencia?", session_id="session-123")
+        )
+
+        assert items[:2] == ["<p>Para obtener ", "una licencia</p>"]
+        output = items[-1]
+        assert isinstance(output, QueryOutput)
+        assert output.answer == "<p>Para obtener una licencia</p>"
+        assert output.sources
+        streaming_chat_service.generate_answer.assert_not_called()
+
+        # La respuesta completa se guarda en la sesión
+        saved = mock_session_store.add_messages.call_args[0][1][-1]
+        assert saved.content == output.answer
+
+    @pytest.mark.asyncio
+    async def test_stream_special_command_yields_only_output(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        streaming_chat_service
+    ):
+        """Test: Un comando especial produce solo el QueryOutput"""
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=streaming_chat_service
+        )
+
+        items = await self._collect(use_case, QueryInput(query="ayuda"))
+
+        assert len(items) == 1
+        assert items[0].document_name == "Sistema de Ayuda"
+        streaming_chat_service.stream_answer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_result_is_cached(
+        self,
+        mock_embedding_service,
+        mock_vector_store,
+        streaming_chat_service
+    ):
+        """Test: La respuesta emitida se cachea para la siguiente consulta igual"""
+        use_case = QueryRAGUseCase(
+            embedding_service=mock_embedding_service,
+            vector_store=mock_vector_store,
+            chat_service=streaming_chat_service,
+            semantic_cache=SemanticCache()
+        )
+        query_input = QueryInput(query="¿Cuánto cuesta una licencia?")
+
+        await self._collect(use_case, query_input)
+        items = await self._collect(use_case, query_input)
+
+        assert len(items) == 1
+        assert items[0].answer == "<p>Para obtener una licencia</p>"
+        streaming_chat_service.stream_answer.assert_called_once()
@@ -3,7 +3,7 @@ Unit tests for ChatSession entity
 """
 import pytest
 from datetime import datetime
-from domain.entities.chat_session import ChatSession
+from domain.entities.chat_session import ChatSession, MAX_SESSION_MESSAGES
 from domain.entities.chat_message import ChatMessage
 
 
@@ -95,6 +95,29 @@ class TestChatSession:
         assert len(recent) == 5
         assert recent[0].content == "Message 5"  # Debería empezar desde el mensaje 5
 
+    def test_messages_capped_at_max(self):
+        """Test: La sesión solo retiene los últimos MAX_SESSION_MESSAGES mensajes"""
+        session = ChatSession(session_id="session-test")
+
+        for i in range(MAX_SESSION_MESSAGES + 5):
+            session.add_message(
+                ChatMessage(role='user', content=f"Message {i}", created_at=datetime.now())
+            )
+
+        assert session.get_message_count() == MAX_SESSION_MESSAGES
+        assert session.messages[0].content == "Message 5"
+
+    def test_messages_list_is_capped(self):
+        """Test: Una lista de mensajes inicial también se acota"""
+        messages = [
+            ChatMessage(role='user', content=f"Message {i}", created_at=datetime.now())
+            for i in range(MAX_SESSION_MESSAGES + 1)
+        ]
+
+        session = ChatSession(session_id="session-test", messages=messages)
+
+        assert session.get_message_count() == MAX_SESSION_MESSAGES
+
     def test_get_recent_messages_zero_limit(self, sample_chat_session):
         """Test: Límite 0 retorna todos los mensajes"""
         recent = sample_chat_session.get_recent_messages(limit=0)
@@ -150,6 +173,30 @@ class TestChatSession:
         assert sample_chat_session.has_messages() is False
         assert sample_chat_session.get_message_count() == 0
 
+    def test_total_messages_overrides_loaded_count(self):
+        """Test: total_messages se usa como conteo cuando los mensajes no se cargan"""
+        session = ChatSession(session_id="session-listed", total_messages=7)
+
+        assert session.get_message_count() == 7
+
+        session.add_message(ChatMessage(role="user", content="Hola", created_at=datetime.now()))
+        assert session.get_message_count() == 8
+
+        session.clear_history()
+        assert session.get_message_count() == 0
+
+    def test_get_last_message(self, sample_chat_session, empty_chat_session):
+        """Test: El último mensaje sale del historial cargado o de last_message"""
+        assert sample_chat_session.get_last_message() is sample_chat_session.messages[-1]
+        assert empty_chat_session.get_last_message() is None
+
+        last = ChatMessage(role="assistant", content="Respuesta", created_at=datetime.now())
+        listed = ChatSession(session_id="session-listed", total_messages=4, last_message=last)
+        assert listed.get_last_message() is last
+
+        listed.clear_history()
+        assert listed.get_last_message() is None
+
     def test_has_messages_true(self, sample_chat_session):
         """Test: has_messages retorna True cuando hay mensajes"""
         assert sample_chat_session.has_messages() is True
@@ -1,6 +1,7 @@
 """
 Unit tests for DocumentChunk entity
 """
+import numpy as np
 import pytest
 from typing import List
 from domain.entities.chunk import DocumentChunk
@@ -18,6 +19,11 @@ class TestDocumentChunk:
         assert sample_chunk.chunk_index == 0
         assert len(sample_chunk.embedding) == 768
 
+    def test_embedding_stored_as_float32_array(self, sample_chunk):
+        """Test: El embedding se convierte a un array float32"""
+        assert isinstance(sample_chunk.embedding, np.ndarray)
+        assert sample_chunk.embedding.dtype == np.float32
+
     def test_embedding_dimension_property(self, sample_chunk):
         """Test: Propiedad embedding_dimension retorna longitud correcta"""
         assert sample_chunk.embedding_dimension == 768
@@ -21,7 +21,7 @@ class TestFeedback:
         assert feedback.is_correct is None
         assert feedback.rating is None
         assert feedback.created_at is not None
-        assert feedback.updated_at is not None
+        assert feedback.updated_at == feedback.created_at
 
     def test_create_feedback_with_all_fields(self):
         """Prueba creación de feedback con todos los campos"""
@@ -257,6 +257,20 @@ class TestFeedback:
 
         assert result['metadata'] == {"custom": "data"}
 
+    def test_to_dict_reflects_updated_timestamp(self):
+        """Prueba que to_dict refleja updated_at tras modificar el feedback"""
+        feedback = Feedback(
+            query="Pregunta",
+            answer="Respuesta",
+            updated_at=datetime(2024, 1, 1, 10, 0, 0)
+        )
+        assert feedback.to_dict()['updated_at'] == "2024-01-01T10:00:00"
+
+        feedback.mark_as_correct()
+
+        assert feedback.to_dict()['updated_at'] == feedback.updated_at.isoformat()
+        assert feedback.to_dict()['updated_at'] != "2024-01-01T10:00:00"
+
 
 class TestExactitudMetrics:
     """Tests para ExactitudMetrics"""
@@ -24,6 +24,7 @@ class TestSimilarChunk:
         assert chunk.page_number == 5
         assert chunk.similarity_score == 0.85
         assert chunk.metadata is None
+        assert chunk.chunk_id is None
 
     def test_create_similar_chunk_with_metadata(self):
         """Prueba creación de SimilarChunk con metadata"""
@@ -136,8 +137,7 @@ class TestQueryResult:
 
         unique = result.get_unique_documents()
 
-        assert len(unique) == 3
-        assert set(unique) == {"doc1.pdf", "doc2.pdf", "doc3.pdf"}
+        assert unique == ["doc1.pdf", "doc2.pdf", "doc3.pdf"]
 
     def test_get_unique_documents_empty(self):
         """Prueba obtener documentos únicos cuando no hay fuentes"""
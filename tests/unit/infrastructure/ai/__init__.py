@@ -0,0 +1 @@
+"""AI services unit tests package"""
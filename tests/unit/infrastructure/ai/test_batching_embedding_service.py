@@ -0,0 +1,40 @@
+"""
+Unit tests for BatchingEmbeddingService
+"""
+import asyncio
+from typing import List
+
+import pytest
+
+from infrastructure.ai.batching_embedding_service import BatchingEmbeddingService
+from core.exceptions import EmbeddingGenerationError
+
+
+class ShortBatchEmbeddingService:
+    """Servicio de embeddings que devuelve un embedding menos de los pedidos"""
+
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        return [[0.1, 0.2] for _ in queries[1:]]
+
+
+class TestBatchingEmbeddingService:
+    """Tests para BatchingEmbeddingService"""
+
+    @pytest.mark.asyncio
+    async def test_short_batch_fails_every_query(self):
+        """Test: Si el lote devuelve menos embeddings, ninguna consulta queda esperando"""
+        service = BatchingEmbeddingService(ShortBatchEmbeddingService(), max_wait_ms=50)
+
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    *(service.generate_query_embedding(f"consulta {i}") for i in range(3)),
+                    return_exceptions=True
+                ),
+                timeout=2
+            )
+        finally:
+            service._worker.cancel()
+
+        assert len(results) == 3
+        assert all(isinstance(result, EmbeddingGenerationError) for result in results)
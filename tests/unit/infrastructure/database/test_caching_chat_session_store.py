@@ -0,0 +1,90 @@
+"""
+Unit tests for CachingChatSessionStore
+"""
+import asyncio
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from infrastructure.database.caching_chat_session_store import CachingChatSessionStore
+from domain.entities.chat_session import ChatSession
+from domain.entities.chat_message import ChatMessage
+
+
+class SlowWriteStore:
+    """Almacén en memoria cuyas escrituras esperan a que el test las libere"""
+
+    def __init__(self):
+        self.messages: List[ChatMessage] = []
+        self.release_write = asyncio.Event()
+        self.write_started = asyncio.Event()
+
+    async def get_session_summary(self, session_id: str) -> ChatSession:
+        return ChatSession(session_id=session_id, total_messages=len(self.messages))
+
+    async def get_all_sessions(self, user_id=None, limit=50, before=None) -> List[ChatSession]:
+        return [ChatSession(session_id="session-1", total_messages=len(self.messages))]
+
+    async def add_messages(self, session_id: str, messages: List[ChatMessage]) -> None:
+        self.write_started.set()
+        await self.release_write.wait()
+        self.messages.extend(messages)
+
+
+def _message(content: str) -> ChatMessage:
+    return ChatMessage(role="user", content=content, created_at=datetime.now())
+
+
+class TestCachingChatSessionStore:
+    """Tests para CachingChatSessionStore"""
+
+    @pytest.mark.asyncio
+    async def test_read_during_write_is_not_cached(self):
+        """Test: Una lectura que coincide con una escritura no deja en cache el estado anterior"""
+        inner = SlowWriteStore()
+        store = CachingChatSessionStore(inner, ttl_seconds=60)
+
+        write = asyncio.create_task(store.add_messages("session-1", [_message("Hola")]))
+        await inner.write_started.wait()
+
+        during = await store.get_session_summary("session-1")
+        assert during.get_message_count() == 0
+
+        inner.release_write.set()
+        await write
+
+        after = await store.get_session_summary("session-1")
+        assert after.get_message_count() == 1
+
+    @pytest.mark.asyncio
+    async def test_listing_during_write_is_not_cached(self):
+        """Test: Un listado obtenido durante una escritura no deja en cache el conteo anterior"""
+        inner = SlowWriteStore()
+        store = CachingChatSessionStore(inner, ttl_seconds=60)
+
+        write = asyncio.create_task(store.add_messages("session-1", [_message("Hola")]))
+        await inner.write_started.wait()
+
+        during = await store.get_all_sessions()
+        assert during[0].get_message_count() == 0
+
+        inner.release_write.set()
+        await write
+
+        after = await store.get_all_sessions()
+        assert after[0].get_message_count() == 1
+
+    @pytest.mark.asyncio
+    async def test_summary_is_cached_until_next_write(self):
+        """Test: El resumen de una sesión se cachea y una escritura lo invalida"""
+        inner = SlowWriteStore()
+        inner.release_write.set()
+        store = CachingChatSessionStore(inner, ttl_seconds=60)
+
+        first = await store.get_session_summary("session-1")
+        inner.messages.append(_message("Hola"))
+        assert (await store.get_session_summary("session-1")).get_message_count() == first.get_message_count() == 0
+
+        await store.add_messages("session-1", [_message("Otra")])
+        assert (await store.get_session_summary("session-1")).get_message_count() == 2